@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Async Workspace Controller - aiohttp variant of WorkspaceController for fan-out API calls
+Issues independent Coder API requests concurrently instead of one after another
+"""
+
+import asyncio
+from typing import List, Dict, Optional, Tuple
+
+import aiohttp
+
+# Import the workspace controller
+from workspace_controller import (WorkspaceController, MAX_RETRIES, RateLimiter, backoff_delay,
+                                  encode_json, is_retryable, is_stop_reason_error, load_json)
+
+class AsyncWorkspaceController:
+    """Async controller for Coder operations that fan out into many API calls"""
+    
+    def __init__(self, coder_url: str = None, token: str = None, max_concurrent: int = 16):
+        """
+        Initialize async workspace controller
+        
+        Args:
+            coder_url: Coder instance URL (defaults to CODER_URL env var)
+            token: API token (defaults to CODER_TOKEN env var or audit-token.txt)
+            max_concurrent: Maximum concurrent connections to the Coder host
+        """
+        # The sync controller resolves URL/token and renders the shared reports
+        self.controller = WorkspaceController(coder_url, token)
+        self.coder_url = self.controller.coder_url
+        self.headers = self.controller.headers
+        self.max_concurrent = max_concurrent
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # Serializes stop-body probing; created inside the running event loop
+        self._stop_body_lock: Optional[asyncio.Lock] = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the pooled client session, creating it inside the running event loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrent,
+                                             limit_per_host=self.max_concurrent,
+                                             ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                                  timeout=aiohttp.ClientTimeout(total=30))
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the client session and the sync controller's session"""
+        if self._session is not None:
+            await self._session.close()
+        self.controller.close()
+    
+    async def __aenter__(self) -> "AsyncWorkspaceController":
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+    
+    async def _make_request(self, method: str, endpoint: str, data: Dict = None,
+                            retries: int = MAX_RETRIES) -> Dict:
+        """
+        Make API request with error handling and retries
+        
+        Uses the same retry policy as WorkspaceController's session adapter.
+        
+        Args:
+            method: HTTP method (GET, POST, PUT, DELETE)
+            endpoint: API endpoint (without base URL)
+            data: Request payload for POST/PUT requests
+            retries: Number of retry attempts
+            
+        Returns:
+            Response JSON data
+            
+        Raises:
+            Exception: If request fails after all retries
+        """
+        url = f"{self.coder_url}{endpoint}"
+        method = method.upper()
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        
+        # Pre-encoded so aiohttp skips its own JSON encoder; the session sets Content-Type
+        body = encode_json(data) if data and method in ('POST', 'PUT') else None
+        session = self._get_session()
+        
+        for attempt in range(retries + 1):
+            try:
+                async with session.request(method, url, data=body) as response:
+                    if response.status in (200, 201, 204):
+                        content = await response.read()
+                        return load_json(content) if content else {}
+                    if attempt < retries and is_retryable(method, response.status):
+                        delay = backoff_delay(attempt, response.headers.get('Retry-After'))
+                        print(f"API error {response.status} (attempt {attempt + 1}/{retries + 1}), retrying in {delay:.1f}s")
+                    elif response.status == 404:
+                        raise Exception(f"Resource not found: {endpoint}")
+                    elif response.status == 403:
+                        raise Exception(f"Permission denied: {endpoint}")
+                    else:
+                        raise Exception(f"API error {response.status}: {await response.text()}")
+            
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # Like urllib3: connect failures never reached the server, so any
+                # method may retry; other errors only for idempotent methods
+                connect_error = isinstance(e, aiohttp.ClientConnectorError)
+                if attempt < retries and (connect_error or is_retryable(method)):
+                    delay = backoff_delay(attempt)
+                    print(f"Request failed (attempt {attempt + 1}/{retries + 1}), retrying in {delay:.1f}s: {e}")
+                else:
+                    raise Exception(f"Request failed after {attempt + 1} attempts: {e}")
+            
+            # Sleep outside the response context so the connection is released first
+            await asyncio.sleep(delay)
+    
+    async def get_current_user(self) -> Optional[Dict]:
+        """
+        Get current user information
+        
+        Returns:
+            Current user information or None if not available
+        """
+        try:
+            return await self._make_request('GET', '/api/v2/users/me')
+        except Exception as e:
+            print(f"Error fetching current user: {e}")
+            return None
+    
+    async def get_deployment_config(self) -> Optional[Dict]:
+        """
+        Get deployment configuration (includes enterprise settings)
+        
+        Returns:
+            Deployment configuration or None if not available
+        """
+        try:
+            return await self._make_request('GET', '/api/v2/deployment/config')
+        except Exception as e:
+            print(f"Error fetching deployment config: {e}")
+            return None
+    
+    async def get_user_quiet_hours_schedule(self, username: str = None) -> Optional[Dict]:
+        """
+        Get user quiet hours schedule configuration
+        
+        Args:
+            username: Username to get schedule for (defaults to current user)
+            
+        Returns:
+            User quiet hours schedule or None if not available
+        """
+        try:
+            endpoint = f"/api/v2/users/{username or 'me'}/quiet-hours"
+            return await self._make_request('GET', endpoint)
+        except Exception as e:
+            print(f"Error fetching user quiet hours schedule: {e}")
+            return None
+    
+    async def get_groups(self, organization_id: str = None) -> List[Dict]:
+        """
+        Get groups, optionally filtered by organization
+        
+        Args:
+            organization_id: Optional organization ID to filter by
+            
+        Returns:
+            List of group dictionaries
+        """
+        try:
+            if organization_id:
+                endpoint = f"/api/v2/organizations/{organization_id}/groups"
+            else:
+                endpoint = "/api/v2/groups"
+            
+            response = await self._make_request('GET', endpoint)
+            return response if isinstance(response, list) else []
+        except Exception as e:
+            print(f"Error fetching groups: {e}")
+            return []
+    
+    async def get_group_members(self, group_id: str) -> List[Dict]:
+        """
+        Get members of a specific group
+        
+        Args:
+            group_id: Group ID
+            
+        Returns:
+            List of user dictionaries in the group
+        """
+        try:
+            response = await self._make_request('GET', f"/api/v2/groups/{group_id}/members")
+            return response if isinstance(response, list) else []
+        except Exception as e:
+            print(f"Error fetching group members for {group_id}: {e}")
+            return []
+    
+    async def get_user_groups(self, user_id: str, max_concurrent: int = 10) -> List[Dict]:
+        """
+        Get groups that a user belongs to, fetching group memberships concurrently
+        
+        Args:
+            user_id: User ID
+            max_concurrent: Maximum concurrent member lookups
+            
+        Returns:
+            List of group dictionaries
+        """
+        all_groups = await self.get_groups()
+        semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        
+        async def members_of(group: Dict) -> List[Dict]:
+            # Group listings usually embed members; only fetch them when missing
+            if group.get('members') is not None:
+                return group['members']
+            async with semaphore:
+                return await self.get_group_members(group.get('id', ''))
+        
+        memberships = await asyncio.gather(*(members_of(group) for group in all_groups))
+        return [group for group, members in zip(all_groups, memberships)
+                if any(member.get('id') == user_id for member in members)]
+    
+    async def stop_workspace(self, workspace_id: str, reason: str = "Automated stop") -> bool:
+        """
+        Stop a specific workspace
+        
+        Stops use the body learned by the sync controller; while it is unknown
+        or stale, the stop goes through WorkspaceController.stop_workspace, which
+        probes for (and remembers) the body the server accepts.
+        
+        Args:
+            workspace_id: Workspace ID to stop
+            reason: Reason for stopping (for logging only, not sent to API)
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        endpoint = f"/api/v2/workspaces/{workspace_id}/builds"
+        if self._stop_body_lock is None:
+            self._stop_body_lock = asyncio.Lock()
+        
+        try:
+            # Reuse the body learned in this or an earlier run (disk read and
+            # buildinfo lookup are blocking, keep them off the event loop)
+            body = self.controller.stop_body
+            if body is None:
+                body = await asyncio.to_thread(self.controller.load_stop_body)
+            if body is None:
+                # First stop: probe once while concurrent stops wait for the result
+                async with self._stop_body_lock:
+                    body = self.controller.stop_body
+                    if body is None:
+                        return await asyncio.to_thread(self.controller.stop_workspace,
+                                                       workspace_id, reason)
+            
+            try:
+                await self._make_request('POST', endpoint, body)
+            except Exception as api_error:
+                if not is_stop_reason_error(api_error):
+                    raise
+                # The server stopped accepting the learned body: let the sync
+                # controller re-learn it for this workspace
+                async with self._stop_body_lock:
+                    return await asyncio.to_thread(self.controller.stop_workspace,
+                                                   workspace_id, reason)
+            
+            self.controller.report_stopped(workspace_id, reason, body)
+            return True
+            
+        except Exception as e:
+            print(f"Failed to stop workspace {workspace_id}: {e}")
+            return False
+    
+    async def bulk_stop_workspaces(self, workspace_ids: List[str], reason: str = "Bulk stop",
+                                   max_concurrent: int = 5, max_per_second: float = 2.0) -> Dict[str, bool]:
+        """
+        Stop multiple workspaces concurrently with rate limiting
+        
+        Args:
+            workspace_ids: List of workspace IDs to stop
+            reason: Reason for stopping
+            max_concurrent: Maximum concurrent stop operations
+            max_per_second: Maximum stop operations started per second across all tasks
+            
+        Returns:
+            Dictionary mapping workspace_id to success status
+        """
+        if not workspace_ids:
+            return {}
+        
+        semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        limiter = RateLimiter(max_per_second, burst=max(1, max_concurrent))
+        
+        async def stop_one(workspace_id: str) -> bool:
+            async with semaphore:
+                await limiter.acquire_async()
+                return await self.stop_workspace(workspace_id, reason)
+        
+        outcomes = await asyncio.gather(*(stop_one(wid) for wid in workspace_ids),
+                                        return_exceptions=True)
+        return {wid: outcome is True for wid, outcome in zip(workspace_ids, outcomes)}
+    
+    async def fetch_enterprise_quiet_hours(self) -> Tuple[Optional[Dict], Optional[Dict], Optional[Dict]]:
+        """
+        Fetch everything print_enterprise_quiet_hours() shows, concurrently
+        
+        Returns:
+            Tuple of (current_user, deployment_config, user_schedule)
+        """
+        return tuple(await asyncio.gather(self.get_current_user(),
+                                          self.get_deployment_config(),
+                                          self.get_user_quiet_hours_schedule()))
+    
+    async def print_enterprise_quiet_hours(self) -> None:
+        """Print enterprise and user quiet hours information after fetching it concurrently"""
+        current_user, deployment_config, user_schedule = await self.fetch_enterprise_quiet_hours()
+        self.controller.print_enterprise_quiet_hours(current_user, deployment_config, user_schedule)
+
@@ -5,13 +5,20 @@ Extends the coder-audit-simple project with enterprise quiet hours visibility
 """
 
 import argparse
-import json
 import os
 import sys
 from datetime import datetime, timezone
+from functools import lru_cache
 
 # Import the workspace controller
-from workspace_controller import WorkspaceController
+from workspace_controller import WorkspaceController, dump_json
+
+BANNER = "=" * 80
+
+@lru_cache(maxsize=1)
+def _run_timestamp() -> str:
+    """UTC timestamp for this run, computed once per process"""
+    return datetime.now(timezone.utc).isoformat()
 
 def main():
     """Main function to display enterprise quiet hours information"""
@@ -32,33 +39,38 @@ def main():
             print("Error: Could not connect to Coder API")
             sys.exit(1)
         
+        # Fetch everything once, then hand it to the requested formatter
+        current_user = controller.get_current_user()
+        deployment_config = controller.get_deployment_config()
+        user_schedule = controller.get_user_quiet_hours_schedule(args.user)
+        
         if args.json:
             # Output in JSON format
             data = {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "current_user": controller.get_current_user(),
-                "enterprise_config": controller.get_deployment_config(),
-                "user_quiet_hours": controller.get_user_quiet_hours_schedule(args.user)
+                "timestamp": _run_timestamp(),
+                "current_user": current_user,
+                "enterprise_config": deployment_config,
+                "user_quiet_hours": user_schedule
             }
-            print(json.dumps(data, indent=2))
-        else:
+            dump_json(data)
+        elif not args.user:
             # Output in human-readable format
-            controller.print_enterprise_quiet_hours()
+            controller.print_enterprise_quiet_hours(current_user, deployment_config, user_schedule)
+        else:
+            controller.print_enterprise_quiet_hours(current_user, deployment_config)
+            
+            # Specific user requested, show their schedule too
+            print(f"\n{BANNER}")
+            print(f"USER QUIET HOURS FOR: {args.user}")
+            print(f"{BANNER}")
+            
+            if user_schedule:
+                print("UserQuietHoursScheduleResponse:")
+                dump_json(user_schedule)
+            else:
+                print(f"No quiet hours schedule found for user: {args.user}")
             
-            # If specific user requested, show their schedule too
-            if args.user:
-                print(f"\n{'='*80}")
-                print(f"USER QUIET HOURS FOR: {args.user}")
-                print(f"{'='*80}")
-                
-                user_schedule = controller.get_user_quiet_hours_schedule(args.user)
-                if user_schedule:
-                    print("UserQuietHoursScheduleResponse:")
-                    print(json.dumps(user_schedule, indent=2))
-                else:
-                    print(f"No quiet hours schedule found for user: {args.user}")
-                
-                print(f"{'='*80}")
+            print(f"{BANNER}")
     
     except Exception as e:
         print(f"Error: {e}")
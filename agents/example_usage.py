@@ -4,29 +4,47 @@ Example Usage - Demonstrates how to use the Coder Workspace Management Agents
 This script shows practical examples of using the agents programmatically
 """
 
+import argparse
+import asyncio
+import contextvars
+import io
 import sys
 import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
+from itertools import islice
+from typing import Optional
 
 # Import the agents
-from workspace_controller import WorkspaceController
+from workspace_controller import get_default_controller
 from quiet_hours_agent import QuietHoursAgent
-from ttl_monitor_agent import TTLMonitorAgent
+from ttl_monitor_agent import TTLMonitorAgent, WorkspaceRow
+
+BANNER = "=" * 80
+SECTION_BANNER = "=" * 60
+
+@dataclass
+class ExampleResult:
+    """Outcome of a single example run"""
+    success: bool
+    error: Optional[str] = None
 
 def example_basic_workspace_operations():
     """Example: Basic workspace operations using WorkspaceController"""
-    print("=" * 60)
+    print(SECTION_BANNER)
     print("EXAMPLE 1: Basic Workspace Operations")
-    print("=" * 60)
+    print(SECTION_BANNER)
     
     try:
-        # Initialize controller
-        controller = WorkspaceController()
+        # Use the shared controller
+        controller = get_default_controller()
         
         # Test connection
         if not controller.validate_connection():
             print("❌ Failed to connect to Coder API")
-            return False
+            return ExampleResult(False, "Failed to connect to Coder API")
         
         print("✅ Connected to Coder API successfully")
         
@@ -41,31 +59,30 @@ def example_basic_workspace_operations():
         # Show running workspaces
         if running:
             print("\nRunning workspaces:")
-            for ws in running[:5]:  # Show first 5
-                print(f"  - {controller.workspace_summary(ws)}")
+            for summary in map(controller.workspace_summary, islice(running, 5)):  # Show first 5
+                print(f"  - {summary}")
             if len(running) > 5:
                 print(f"  ... and {len(running) - 5} more")
         
-        return True
+        return ExampleResult(True)
         
     except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
+        return ExampleResult(False, str(e))
 
 def example_quiet_hours_check():
     """Example: Check quiet hours status"""
-    print("\n" + "=" * 60)
+    print("\n" + SECTION_BANNER)
     print("EXAMPLE 2: Quiet Hours Status Check")
-    print("=" * 60)
+    print(SECTION_BANNER)
     
     try:
         # Initialize quiet hours agent
-        agent = QuietHoursAgent()
+        agent = QuietHoursAgent(controller=get_default_controller())
         
         # Check current status
-        current_time = agent._get_current_time()
-        is_quiet = agent.is_quiet_hours()
-        grace_over = agent.is_grace_period_over()
+        current_time = agent.current_time
+        is_quiet = agent.quiet_hours_active
+        grace_over = agent.grace_period_over
         
         print(f"🕐 Current time: {current_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
         print(f"🌙 Quiet hours active: {'Yes' if is_quiet else 'No'}")
@@ -77,7 +94,7 @@ def example_quiet_hours_check():
         
         if workspaces_to_stop:
             print("\nWorkspaces that would be stopped:")
-            for ws in workspaces_to_stop[:3]:  # Show first 3
+            for ws in islice(workspaces_to_stop, 3):  # Show first 3
                 print(f"  - {agent.controller.workspace_summary(ws)}")
             if len(workspaces_to_stop) > 3:
                 print(f"  ... and {len(workspaces_to_stop) - 3} more")
@@ -87,21 +104,20 @@ def example_quiet_hours_check():
         report = agent.generate_report()
         print(f"Action required: {report['action_required']}")
         
-        return True
+        return ExampleResult(True)
         
     except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
+        return ExampleResult(False, str(e))
 
 def example_ttl_compliance():
     """Example: TTL compliance monitoring"""
-    print("\n" + "=" * 60)
+    print("\n" + SECTION_BANNER)
     print("EXAMPLE 3: TTL Compliance Report")
-    print("=" * 60)
+    print(SECTION_BANNER)
     
     try:
         # Initialize TTL monitor agent
-        agent = TTLMonitorAgent()
+        agent = TTLMonitorAgent(controller=get_default_controller())
         
         # Generate compliance report
         report = agent.get_ttl_compliance_report()
@@ -115,41 +131,76 @@ def example_ttl_compliance():
         # Show expired workspaces
         if report['workspaces']['expired']:
             print("\n🔴 Workspaces that SHOULD HAVE STOPPED:")
-            for ws in report['workspaces']['expired'][:3]:
-                print(f"  - {ws['owner']}/{ws['name']}: {ws['time_remaining']}")
+            for ws in map(WorkspaceRow.from_analysis, islice(report['workspaces']['expired'], 3)):
+                print(f"  - {ws.owner}/{ws.name}: {ws.time_remaining}")
             if len(report['workspaces']['expired']) > 3:
                 print(f"  ... and {len(report['workspaces']['expired']) - 3} more")
         
         # Show expiring soon
         if report['workspaces']['expiring_soon']:
             print("\n🟡 Workspaces EXPIRING SOON:")
-            for ws in report['workspaces']['expiring_soon'][:3]:
-                print(f"  - {ws['owner']}/{ws['name']}: {ws['time_remaining']}")
+            for ws in map(WorkspaceRow.from_analysis, islice(report['workspaces']['expiring_soon'], 3)):
+                print(f"  - {ws.owner}/{ws.name}: {ws.time_remaining}")
             if len(report['workspaces']['expiring_soon']) > 3:
                 print(f"  ... and {len(report['workspaces']['expiring_soon']) - 3} more")
         
-        return True
+        return ExampleResult(True)
         
     except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
+        return ExampleResult(False, str(e))
 
-def example_combined_analysis():
-    """Example: Combined analysis using multiple agents"""
-    print("\n" + "=" * 60)
+def example_combined_analysis(quick: bool = False):
+    """
+    Example: Combined analysis using multiple agents
+    
+    Args:
+        quick: Skip the full TTL compliance report and only analyze the current
+               user's running workspaces (the report's default scope)
+    """
+    print("\n" + SECTION_BANNER)
     print("EXAMPLE 4: Comprehensive Workspace Analysis")
-    print("=" * 60)
+    print(SECTION_BANNER)
     
     try:
-        # Initialize agents
-        controller = WorkspaceController()
-        quiet_agent = QuietHoursAgent()
-        ttl_agent = TTLMonitorAgent()
+        # Initialize agents sharing one controller (and HTTP session)
+        controller = get_default_controller()
+        quiet_agent = QuietHoursAgent(controller=controller)
+        ttl_agent = TTLMonitorAgent(controller=controller)
         
         print("🔍 Performing combined workspace analysis...")
         
-        # Get all running workspaces
-        running_workspaces = controller.get_running_workspaces()
+        # Issue the independent API-bound lookups concurrently, each in a copy of
+        # this example's context so their output lands in its captured buffer
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            running_future = executor.submit(contextvars.copy_context().run,
+                                             controller.get_running_workspaces)
+            ttl_future = user_future = None
+            if quick:
+                user_future = executor.submit(contextvars.copy_context().run,
+                                              controller.get_current_user)
+            else:
+                ttl_future = executor.submit(contextvars.copy_context().run,
+                                             ttl_agent.get_ttl_compliance_report)
+            quiet_future = None
+            if quiet_agent.quiet_hours_active and quiet_agent.grace_period_over:
+                quiet_future = executor.submit(contextvars.copy_context().run,
+                                               quiet_agent.get_workspaces_to_stop)
+            
+            running_workspaces = running_future.result()
+            ttl_report = ttl_future.result() if ttl_future else None
+            quiet_workspaces = quiet_future.result() if quiet_future else []
+        
+        if ttl_report is not None:
+            ttl_expired = ttl_report["workspaces"]["expired"]
+            ttl_expiring_soon_count = ttl_report["summary"]["expiring_soon"]
+        else:
+            # Quick mode: only running workspaces can be out of TTL compliance anyway;
+            # keep the report's scope of the current user's workspaces
+            username = (user_future.result() or {}).get('username')
+            analyses = [ttl_agent.analyze_workspace_ttl(ws) for ws in running_workspaces
+                        if ws.get('owner_name') == username]
+            ttl_expired = [a for a in analyses if a["compliance_status"] == "EXPIRED"]
+            ttl_expiring_soon_count = sum(1 for a in analyses if a["compliance_status"] == "EXPIRING_SOON")
         
         # Analyze each workspace
         analysis_results = {
@@ -161,26 +212,23 @@ def example_combined_analysis():
         }
         
         # Check quiet hours impact
-        if quiet_agent.is_quiet_hours() and quiet_agent.is_grace_period_over():
-            quiet_workspaces = quiet_agent.get_workspaces_to_stop()
-            analysis_results["quiet_hours_affected"] = len(quiet_workspaces)
-            
-            for ws in quiet_workspaces:
-                analysis_results["action_needed"].append({
-                    "workspace": controller.workspace_summary(ws),
-                    "reason": "Quiet hours policy",
-                    "priority": "high"
-                })
+        analysis_results["quiet_hours_affected"] = len(quiet_workspaces)
+        
+        for summary in map(controller.workspace_summary, quiet_workspaces):
+            analysis_results["action_needed"].append({
+                "workspace": summary,
+                "reason": "Quiet hours policy",
+                "priority": "high"
+            })
         
         # Check TTL compliance
-        ttl_report = ttl_agent.get_ttl_compliance_report()
-        analysis_results["ttl_expired"] = ttl_report["summary"]["expired"]
-        analysis_results["ttl_expiring_soon"] = ttl_report["summary"]["expiring_soon"]
+        analysis_results["ttl_expired"] = len(ttl_expired)
+        analysis_results["ttl_expiring_soon"] = ttl_expiring_soon_count
         
-        for ws in ttl_report["workspaces"]["expired"]:
+        for ws in map(WorkspaceRow.from_analysis, ttl_expired):
             analysis_results["action_needed"].append({
-                "workspace": f"{ws['owner']}/{ws['name']}",
-                "reason": f"TTL expired: {ws['time_remaining']}",
+                "workspace": f"{ws.owner}/{ws.name}",
+                "reason": f"TTL expired: {ws.time_remaining}",
                 "priority": "critical"
             })
         
@@ -193,7 +241,7 @@ def example_combined_analysis():
         
         if analysis_results["action_needed"]:
             print(f"\n⚠️  Actions needed ({len(analysis_results['action_needed'])}):")
-            for action in analysis_results["action_needed"][:5]:
+            for action in islice(analysis_results["action_needed"], 5):
                 priority_icon = "🔥" if action["priority"] == "critical" else "⚡"
                 print(f"  {priority_icon} {action['workspace']}: {action['reason']}")
             
@@ -202,21 +250,20 @@ def example_combined_analysis():
         else:
             print("\n✅ No immediate actions needed")
         
-        return True
+        return ExampleResult(True)
         
     except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
+        return ExampleResult(False, str(e))
 
 def example_dry_run_operations():
     """Example: Demonstrate dry-run operations"""
-    print("\n" + "=" * 60)
+    print("\n" + SECTION_BANNER)
     print("EXAMPLE 5: Dry-Run Workspace Management")
-    print("=" * 60)
+    print(SECTION_BANNER)
     
     try:
         # Initialize quiet hours agent with dry-run enabled
-        quiet_agent = QuietHoursAgent()
+        quiet_agent = QuietHoursAgent(controller=get_default_controller())
         quiet_agent.dry_run = True
         
         print("🧪 Running in DRY-RUN mode (no actual changes will be made)")
@@ -227,58 +274,99 @@ def example_dry_run_operations():
         
         if results:
             print(f"✅ Dry-run completed: {len(results)} workspaces would be affected")
-            success_count = sum(1 for success in results.values() if success)
+            success_count = sum(results.values())
             print(f"📊 Success rate: {success_count}/{len(results)}")
         else:
             print("ℹ️  No workspaces would be affected by quiet hours policy")
         
-        return True
+        return ExampleResult(True)
         
     except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
+        return ExampleResult(False, str(e))
+
+# Buffer collecting the running example's output. A context variable rather than
+# a thread-local, so it follows the example into any pool thread it submits work
+# to via contextvars.copy_context().run
+_example_output: contextvars.ContextVar = contextvars.ContextVar('_example_output', default=None)
+
+class _ContextOutput(io.TextIOBase):
+    """stdout proxy that routes prints to the current context's example buffer"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def write(self, text: str) -> int:
+        buffer = _example_output.get()
+        return (buffer or self._stream).write(text)
+    
+    def flush(self):
+        self._stream.flush()
+
+def _run_example(example_func) -> tuple:
+    """Run one example in the current context, returning (ExampleResult, captured output)"""
+    buffer = io.StringIO()
+    _example_output.set(buffer)
+    result = example_func()
+    return result, buffer.getvalue()
+
+async def _run_examples(examples: list) -> list:
+    """Run the I/O-bound examples concurrently in worker threads"""
+    output = _ContextOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        # to_thread runs each example in its own copy of the current context
+        return await asyncio.gather(*(
+            asyncio.to_thread(_run_example, example_func)
+            for _, example_func in examples
+        ))
+    finally:
+        sys.stdout = output._stream
 
 def main():
     """Run all examples"""
+    parser = argparse.ArgumentParser(description="Coder Workspace Management Agents - Example Usage")
+    parser.add_argument("--quick", action="store_true",
+                       help="Skip the full TTL compliance report in the combined analysis")
+    args = parser.parse_args()
+    
     print("🚀 Coder Workspace Management Agents - Example Usage")
-    print("=" * 80)
+    print(BANNER)
     
     examples = [
         ("Basic Workspace Operations", example_basic_workspace_operations),
         ("Quiet Hours Status Check", example_quiet_hours_check),
         ("TTL Compliance Monitoring", example_ttl_compliance),
-        ("Combined Analysis", example_combined_analysis),
+        ("Combined Analysis", partial(example_combined_analysis, quick=args.quick)),
         ("Dry-Run Operations", example_dry_run_operations)
     ]
     
-    results = []
-    
-    for name, example_func in examples:
-        try:
-            success = example_func()
-            results.append((name, success))
-        except Exception as e:
-            print(f"❌ Example '{name}' failed: {e}")
-            results.append((name, False))
+    # Examples run concurrently; their output is replayed in declaration order
+    outcomes = asyncio.run(_run_examples(examples))
+    results = [(name, result) for (name, _), (result, _) in zip(examples, outcomes)]
     
     # Summary
-    print("\n" + "=" * 80)
-    print("EXAMPLE EXECUTION SUMMARY")
-    print("=" * 80)
+    lines = ["\n" + BANNER, "EXAMPLE EXECUTION SUMMARY", BANNER]
     
-    for name, success in results:
-        status = "✅ PASSED" if success else "❌ FAILED"
-        print(f"{status}: {name}")
+    for name, result in results:
+        if result.success:
+            lines.append(f"✅ PASSED: {name}")
+        else:
+            lines.append(f"❌ FAILED: {name} ({result.error})")
     
-    successful = sum(1 for _, success in results if success)
-    print(f"\n📊 Overall: {successful}/{len(results)} examples completed successfully")
+    successful = sum(1 for _, result in results if result.success)
+    lines.append(f"\n📊 Overall: {successful}/{len(results)} examples completed successfully")
     
     if successful < len(results):
-        print("\n💡 Tips for troubleshooting:")
-        print("  • Check CODER_URL and CODER_TOKEN environment variables")
-        print("  • Ensure API token has workspace management permissions")
-        print("  • Verify network connectivity to Coder instance")
-        print("  • Check agents_config.json for valid configuration")
+        lines += [
+            "\n💡 Tips for troubleshooting:",
+            "  • Check CODER_URL and CODER_TOKEN environment variables",
+            "  • Ensure API token has workspace management permissions",
+            "  • Verify network connectivity to Coder instance",
+            "  • Check agents_config.json for valid configuration"
+        ]
+    
+    # Emit the example output and summary with a single write
+    sys.stdout.write("".join(output for _, output in outcomes) + "\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
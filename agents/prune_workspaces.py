@@ -4,32 +4,66 @@ Prune Workspaces Agent - Identify and cleanup workspaces within user quiet hours
 Extends the coder-audit-simple project with user-specific quiet hours pruning
 """
 
-import argparse
 import json
 import os
+import re
 import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Optional, Tuple
-import pytz
-from tabulate import tabulate
+from functools import lru_cache
+from typing import List, Dict, Iterator, Optional, Tuple
 
 # Import the workspace controller
-from workspace_controller import WorkspaceController
+from workspace_controller import WorkspaceController, dump_json
+
+# Organization/group/user/template filter settings understood by apply_filters
+FILTER_KEYS = (
+    'include_organizations', 'exclude_organizations',
+    'include_groups', 'exclude_groups',
+    'include_users', 'exclude_users',
+    'include_templates', 'exclude_templates'
+)
+
+# Workspace fields kept on get_workspaces_in_quiet_hours results
+WORKSPACE_FIELDS = ('id', 'name', 'owner_name', 'template_id', 'latest_build', 'created_at')
+
+# Seconds a user's quiet hours schedule is reused from the on-disk cache
+# (same order as the controller's other caches; schedules can be edited anytime)
+QUIET_HOURS_CACHE_TTL = 300
+
+# Above this many owners in quiet hours, one unfiltered listing filtered locally
+# is cheaper than a search request per owner
+OWNER_FETCH_THRESHOLD = 8
+
+# Timezone, minute and hour of a "CRON_TZ=<tz> <min> <hour> <dom> <mon> <dow>" schedule
+_CRON_RE = re.compile(r'^CRON_TZ=(?P<tz>\S+)\s+(?P<min>\S+)\s+(?P<hr>\S+)\s+\S+\s+\S+\s+\S+')
+
+@lru_cache(maxsize=64)
+def _tz(name: str):
+    """Resolve a timezone name once per process"""
+    import pytz  # Deferred: loading pytz's zone data is only needed when checking quiet hours
+    return pytz.timezone(name)
 
 class PruneWorkspacesAgent:
     """Agent for pruning workspaces based on user-specific quiet hours"""
     
-    def __init__(self, config_file: str = "agents_config.json"):
+    def __init__(self, config_file: str = "agents_config.json",
+                 controller: WorkspaceController = None):
         """
         Initialize prune workspaces agent
         
         Args:
             config_file: Path to configuration file
+            controller: Shared WorkspaceController (a new one is created if omitted)
         """
         self.config = self._load_config(config_file)
-        self.controller = WorkspaceController()
+        self.controller = controller or WorkspaceController()
         self.dry_run = False
         
+        # Reuse cached quiet hours schedules; turned off before stopping workspaces
+        self.use_schedule_cache = True
+        
     def _load_config(self, config_file: str) -> Dict:
         """Load configuration from file or use defaults"""
         default_config = {
@@ -69,29 +103,12 @@ class PruneWorkspacesAgent:
         Returns:
             Tuple of (time_str, timezone_str, raw_schedule) or None if invalid
         """
-        try:
-            if not cron_schedule or not cron_schedule.startswith("CRON_TZ="):
-                return None
-            
-            # Split "CRON_TZ=Europe/London 32 13 * * *"
-            parts = cron_schedule.split(" ")
-            if len(parts) < 6:
-                return None
-            
-            # Extract timezone
-            timezone_part = parts[0]  # "CRON_TZ=Europe/London"
-            timezone_str = timezone_part.split("=")[1]
-            
-            # Extract time
-            minute = parts[1]  # "32"
-            hour = parts[2]    # "13"
-            time_str = f"{hour}:{minute}"
-            
-            return time_str, timezone_str, cron_schedule
-            
-        except Exception as e:
-            print(f"Error parsing cron schedule '{cron_schedule}': {e}")
+        # Match "CRON_TZ=Europe/London 32 13 * * *"
+        match = _CRON_RE.match(cron_schedule or "")
+        if not match:
             return None
+        
+        return f"{match['hr']}:{match['min']}", match['tz'], cron_schedule
     
     def get_user_quiet_hours_info(self, username: str = None) -> Optional[Dict]:
         """
@@ -103,6 +120,14 @@ class PruneWorkspacesAgent:
         Returns:
             Dictionary with quiet hours info or None if not available
         """
+        # Reuse what earlier runs fetched for a few minutes, unless we are about to
+        # stop workspaces based on it
+        cache_name = f"quiet_hours-{username or 'me'}"
+        if self.use_schedule_cache:
+            cached = self.controller._cache_load(cache_name, max_age=QUIET_HOURS_CACHE_TTL)
+            if cached is not None:
+                return cached
+        
         try:
             user_schedule = self.controller.get_user_quiet_hours_schedule(username)
             if not user_schedule:
@@ -116,7 +141,7 @@ class PruneWorkspacesAgent:
             
             time_str, timezone_str, _ = parsed
             
-            return {
+            quiet_hours_info = {
                 'username': username or 'current_user',
                 'start_time': time_str,
                 'timezone': timezone_str,
@@ -125,19 +150,23 @@ class PruneWorkspacesAgent:
                 'next_activation': user_schedule.get('next', None),
                 'raw_schedule': raw_schedule
             }
+            self.controller._cache_store(cache_name, quiet_hours_info)
+            return quiet_hours_info
             
         except Exception as e:
             print(f"Error getting quiet hours for user {username}: {e}")
             return None
     
     def is_user_in_quiet_hours(self, user_quiet_hours: Dict, 
-                              quiet_hours_duration: int = None) -> Tuple[bool, Optional[datetime], Optional[datetime]]:
+                              quiet_hours_duration: int = None,
+                              now_utc: datetime = None) -> Tuple[bool, Optional[datetime], Optional[datetime]]:
         """
         Check if current time is within user's quiet hours period
         
         Args:
             user_quiet_hours: User quiet hours information
             quiet_hours_duration: Duration of quiet hours in hours (defaults to config)
+            now_utc: Current UTC time snapshot (defaults to now)
             
         Returns:
             Tuple of (is_in_quiet_hours, quiet_start_time, quiet_end_time)
@@ -151,8 +180,9 @@ class PruneWorkspacesAgent:
             start_time_str = user_quiet_hours['start_time']  # e.g., "13:32"
             
             # Get current time in user's timezone
-            user_tz = pytz.timezone(timezone_str)
-            current_time = datetime.now(user_tz)
+            if now_utc is None:
+                now_utc = datetime.now(timezone.utc)
+            current_time = now_utc.astimezone(_tz(timezone_str))
             
             # Parse start time
             start_hour, start_minute = map(int, start_time_str.split(':'))
@@ -192,13 +222,40 @@ class PruneWorkspacesAgent:
         Returns:
             Filtered list of workspaces
         """
-        filtered_workspaces = []
-        
-        # Cache for user/org/group lookups to avoid repeated API calls
-        user_cache = {}
-        org_cache = {}
-        group_cache = {}
+        return list(self._filter_iter(workspaces, filters))
+    
+    def _filter_iter(self, workspaces: List[Dict], filters: Dict) -> Iterator[Dict]:
+        """
+        Lazily yield the workspaces that pass apply_filters
         
+        Args:
+            workspaces: List of workspaces to filter
+            filters: Dictionary containing filter criteria
+            
+        Returns:
+            Iterator over the filtered workspaces
+        """
+        # Convert the filter lists to sets once so every membership test is O(1)
+        include_users = frozenset(filters.get('include_users') or ())
+        exclude_users = frozenset(filters.get('exclude_users') or ())
+        include_templates = frozenset(filters.get('include_templates') or ())
+        exclude_templates = frozenset(filters.get('exclude_templates') or ())
+        include_orgs = frozenset(filters.get('include_organizations') or ())
+        exclude_orgs = frozenset(filters.get('exclude_organizations') or ())
+        include_groups = frozenset(filters.get('include_groups') or ())
+        exclude_groups = frozenset(filters.get('exclude_groups') or ())
+        
+        # Work out once which filter dimensions are active
+        filter_users = bool(include_users or exclude_users)
+        filter_templates = bool(include_templates or exclude_templates)
+        filter_orgs = bool(include_orgs or exclude_orgs)
+        filter_groups = bool(include_groups or exclude_groups)
+        
+        # Users indexed by username, shared across agents using this controller
+        users_by_name = self.controller.get_users_by_username()
+        
+        # First pass: user and template filters, which need no extra API calls
+        candidates = []
         for workspace in workspaces:
             owner_name = workspace.get('owner_name')
             template_id = workspace.get('template_id')
@@ -206,77 +263,97 @@ class PruneWorkspacesAgent:
             if not owner_name:
                 continue
             
-            # Get user info (with caching)
-            if owner_name not in user_cache:
-                users = self.controller.get_users()
-                user_info = next((u for u in users if u.get('username') == owner_name), None)
-                user_cache[owner_name] = user_info
-            
-            user_info = user_cache[owner_name]
+            user_info = users_by_name.get(owner_name)
             if not user_info:
                 continue  # Skip if user not found
             
-            user_id = user_info.get('id')
-            
             # Apply user filters
-            if filters.get('include_users'):
-                if owner_name not in filters['include_users']:
+            if filter_users:
+                if include_users and owner_name not in include_users:
                     continue
-            
-            if filters.get('exclude_users'):
-                if owner_name in filters['exclude_users']:
+                
+                if exclude_users and owner_name in exclude_users:
                     continue
             
             # Apply template filters
-            if filters.get('include_templates'):
-                if template_id not in filters['include_templates']:
+            if filter_templates:
+                if include_templates and template_id not in include_templates:
                     continue
-            
-            if filters.get('exclude_templates'):
-                if template_id in filters['exclude_templates']:
+                
+                if exclude_templates and template_id in exclude_templates:
                     continue
             
-            # Apply organization filters
-            if filters.get('include_organizations') or filters.get('exclude_organizations'):
-                if user_id not in org_cache:
-                    user_orgs = self.controller.get_user_organizations(user_id)
-                    org_cache[user_id] = [org.get('name', '') for org in user_orgs]
+            candidates.append((workspace, user_info.get('id')))
+        
+        # Prefetch org/group memberships for the remaining users concurrently
+        org_cache = {}
+        group_cache = {}
+        user_ids = {user_id for _, user_id in candidates}
+        if user_ids and (filter_orgs or filter_groups):
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                org_futures = {}
+                group_futures = {}
+                for user_id in user_ids:
+                    if filter_orgs:
+                        org_futures[user_id] = executor.submit(self.controller.get_user_organizations, user_id)
+                    if filter_groups:
+                        group_futures[user_id] = executor.submit(self.controller.get_user_groups, user_id)
                 
+                org_cache = {
+                    user_id: frozenset(org.get('name', '') for org in future.result())
+                    for user_id, future in org_futures.items()
+                }
+                group_cache = {
+                    user_id: frozenset(group.get('name', '') for group in future.result())
+                    for user_id, future in group_futures.items()
+                }
+        
+        # Second pass: organization and group filters
+        for workspace, user_id in candidates:
+            # Apply organization filters
+            if filter_orgs:
                 user_org_names = org_cache[user_id]
                 
-                if filters.get('include_organizations'):
-                    if not any(org in filters['include_organizations'] for org in user_org_names):
-                        continue
+                if include_orgs and include_orgs.isdisjoint(user_org_names):
+                    continue
                 
-                if filters.get('exclude_organizations'):
-                    if any(org in filters['exclude_organizations'] for org in user_org_names):
-                        continue
+                if exclude_orgs and not exclude_orgs.isdisjoint(user_org_names):
+                    continue
             
             # Apply group filters
-            if filters.get('include_groups') or filters.get('exclude_groups'):
-                if user_id not in group_cache:
-                    user_groups = self.controller.get_user_groups(user_id)
-                    group_cache[user_id] = [group.get('name', '') for group in user_groups]
-                
+            if filter_groups:
                 user_group_names = group_cache[user_id]
                 
-                if filters.get('include_groups'):
-                    if not any(group in filters['include_groups'] for group in user_group_names):
-                        continue
+                if include_groups and include_groups.isdisjoint(user_group_names):
+                    continue
                 
-                if filters.get('exclude_groups'):
-                    if any(group in filters['exclude_groups'] for group in user_group_names):
-                        continue
+                if exclude_groups and not exclude_groups.isdisjoint(user_group_names):
+                    continue
             
             # If we get here, the workspace passed all filters
-            filtered_workspaces.append(workspace)
+            yield workspace
+    
+    def _get_quiet_hours_info_for(self, usernames: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch several users' quiet hours information concurrently
+        
+        Args:
+            usernames: Usernames to look up
+            
+        Returns:
+            Dictionary mapping username to quiet hours info (None if not available)
+        """
+        if not usernames:
+            return {}
         
-        return filtered_workspaces
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            return dict(zip(usernames, executor.map(self.get_user_quiet_hours_info, usernames)))
     
     def get_workspaces_in_quiet_hours(self, target_user: str = None, 
                                     quiet_hours_duration: int = None,
                                     include_all_users: bool = False,
-                                    custom_filters: Dict = None) -> List[Dict]:
+                                    custom_filters: Dict = None,
+                                    running_only: bool = False) -> List[Dict]:
         """
         Get workspaces that are within their owner's quiet hours period
         
@@ -284,78 +361,105 @@ class PruneWorkspacesAgent:
             target_user: Specific user to check (defaults to current user)
             quiet_hours_duration: Duration of quiet hours in hours
             include_all_users: Whether to check all users or just target user
+            running_only: Only consider running workspaces (the only ones cleanup can stop)
             
         Returns:
             List of workspaces with quiet hours information
         """
         workspaces_in_quiet_hours = []
         
-        # Get all workspaces
-        all_workspaces = self.controller.get_workspaces()
-        
-        # Get users to check
-        if include_all_users:
-            # For now, we'll check workspaces and try to get quiet hours for each unique owner
-            unique_owners = set(ws.get('owner_name') for ws in all_workspaces if ws.get('owner_name'))
-            users_to_check = list(unique_owners)
-        elif target_user:
-            users_to_check = [target_user]
-        else:
-            # Default to current user
-            current_user = self.controller.get_current_user()
-            if current_user:
-                users_to_check = [current_user.get('username')]
+        # Resolve the single owner to check up front so the server can filter by it
+        owner = None
+        if not include_all_users:
+            if target_user:
+                owner = target_user
             else:
-                users_to_check = []
+                # Default to current user
+                current_user = self.controller.get_current_user()
+                owner = current_user.get('username') if current_user else None
+            
+            if not owner:
+                return workspaces_in_quiet_hours
         
         # Apply comprehensive filters
         filter_config = self.config["prune_workspaces"]
         
-        # Merge custom filters with config
-        filters = {
-            'include_organizations': custom_filters.get('include_organizations', []) if custom_filters else filter_config.get('include_organizations', []),
-            'exclude_organizations': custom_filters.get('exclude_organizations', []) if custom_filters else filter_config.get('exclude_organizations', []),
-            'include_groups': custom_filters.get('include_groups', []) if custom_filters else filter_config.get('include_groups', []),
-            'exclude_groups': custom_filters.get('exclude_groups', []) if custom_filters else filter_config.get('exclude_groups', []),
-            'include_users': custom_filters.get('include_users', []) if custom_filters else filter_config.get('include_users', []),
-            'exclude_users': custom_filters.get('exclude_users', []) if custom_filters else filter_config.get('exclude_users', []),
-            'include_templates': custom_filters.get('include_templates', []) if custom_filters else filter_config.get('include_templates', []),
-            'exclude_templates': custom_filters.get('exclude_templates', []) if custom_filters else filter_config.get('exclude_templates', [])
-        }
-        
-        # Apply filters to all workspaces first
-        filtered_workspaces = self.apply_filters(all_workspaces, filters)
+        # Custom filters replace the configured ones wholesale
+        filter_source = custom_filters or filter_config
+        filters = {key: filter_source.get(key, []) for key in FILTER_KEYS}
         
-        # Then filter by users to check
-        if not include_all_users:
-            filtered_workspaces = [ws for ws in filtered_workspaces if ws.get('owner_name') in users_to_check]
+        status = 'running' if running_only else None
         
-        # Check each user's quiet hours
+        # Check each user's quiet hours against a single clock reading; an owner's
+        # quiet hours window is the same for all of their workspaces
+        now_utc = datetime.now(timezone.utc)
         user_quiet_hours_cache = {}
+        quiet_windows = {}
+        
+        def quiet_window(owner_name: str) -> Tuple[bool, Optional[datetime], Optional[datetime]]:
+            if owner_name not in quiet_windows:
+                user_quiet_hours = user_quiet_hours_cache.get(owner_name)
+                if user_quiet_hours:
+                    quiet_windows[owner_name] = self.is_user_in_quiet_hours(
+                        user_quiet_hours, quiet_hours_duration, now_utc
+                    )
+                else:
+                    # User doesn't have quiet hours configured
+                    quiet_windows[owner_name] = (False, None, None)
+            return quiet_windows[owner_name]
+        
+        # When the owners of interest are known up front, check their quiet hours
+        # first and only fetch workspaces for the owners currently in quiet hours
+        if owner:
+            candidate_owners = [owner]
+        elif filters['include_users']:
+            candidate_owners = list(dict.fromkeys(filters['include_users']))
+        else:
+            candidate_owners = None
+        
+        if candidate_owners is not None:
+            user_quiet_hours_cache.update(self._get_quiet_hours_info_for(candidate_owners))
+            quiet_owners = [name for name in candidate_owners if quiet_window(name)[0]]
+            if len(quiet_owners) > OWNER_FETCH_THRESHOLD:
+                wanted = frozenset(quiet_owners)
+                all_workspaces = [ws for ws in self.controller.get_workspaces(status=status)
+                                  if ws.get('owner_name') in wanted]
+            elif quiet_owners:
+                # Let the server filter by owner and status, one request per owner in parallel
+                with ThreadPoolExecutor(max_workers=len(quiet_owners)) as executor:
+                    per_owner = list(executor.map(
+                        lambda name: self.controller.get_workspaces(owner=name, status=status),
+                        quiet_owners
+                    ))
+                all_workspaces = [ws for owned in per_owner for ws in owned]
+            else:
+                all_workspaces = []
+        else:
+            all_workspaces = self.controller.get_workspaces(status=status)
+        
+        # Apply filters to the fetched workspaces, streaming them into the main loop
+        filtered_workspaces = self._filter_iter(all_workspaces, filters)
+        
+        if candidate_owners is None:
+            # Owners weren't known up front, so collect the survivors and fetch
+            # their quiet hours concurrently before the main loop
+            filtered_workspaces = list(filtered_workspaces)
+            unique_owners = {ws['owner_name'] for ws in filtered_workspaces if ws.get('owner_name')}
+            user_quiet_hours_cache.update(self._get_quiet_hours_info_for(list(unique_owners)))
         
         for workspace in filtered_workspaces:
-            owner = workspace.get('owner_name')
-            if not owner:
+            owner_name = workspace.get('owner_name')
+            if not owner_name:
                 continue
             
-            # Get user's quiet hours info (use cache to avoid repeated API calls)
-            if owner not in user_quiet_hours_cache:
-                user_quiet_hours_cache[owner] = self.get_user_quiet_hours_info(owner)
-            
-            user_quiet_hours = user_quiet_hours_cache[owner]
-            if not user_quiet_hours:
-                continue  # User doesn't have quiet hours configured
-            
             # Check if user is currently in quiet hours
-            is_in_quiet, quiet_start, quiet_end = self.is_user_in_quiet_hours(
-                user_quiet_hours, quiet_hours_duration
-            )
+            is_in_quiet, quiet_start, quiet_end = quiet_window(owner_name)
             
             if is_in_quiet:
-                # Add quiet hours information to workspace
-                workspace_info = workspace.copy()
+                # Keep only the fields reporting and cleanup use, plus quiet hours information
+                workspace_info = {k: workspace[k] for k in WORKSPACE_FIELDS if k in workspace}
                 workspace_info['quiet_hours_info'] = {
-                    'user_quiet_hours': user_quiet_hours,
+                    'user_quiet_hours': user_quiet_hours_cache[owner_name],
                     'quiet_start': quiet_start.isoformat() if quiet_start else None,
                     'quiet_end': quiet_end.isoformat() if quiet_end else None,
                     'is_in_quiet_hours': True
@@ -375,16 +479,18 @@ class PruneWorkspacesAgent:
             print("\n✅ No workspaces found within quiet hours periods")
             return
         
+        from tabulate import tabulate  # Deferred: only needed for human-readable output
+        
         print(f"\n🌙 WORKSPACES WITHIN QUIET HOURS PERIODS ({len(workspaces)})")
         print("=" * 80)
         
         # Group by user for better organization
-        workspaces_by_user = {}
+        workspaces_by_user = defaultdict(list)
         for ws in workspaces:
-            owner = ws.get('owner_name', 'Unknown')
-            if owner not in workspaces_by_user:
-                workspaces_by_user[owner] = []
-            workspaces_by_user[owner].append(ws)
+            workspaces_by_user[ws.get('owner_name', 'Unknown')].append(ws)
+        
+        # Resolve template names once (the controller caches the template list)
+        template_map = self.controller.get_template_map()
         
         for owner, user_workspaces in workspaces_by_user.items():
             # Get quiet hours info from first workspace
@@ -394,9 +500,8 @@ class PruneWorkspacesAgent:
             print(f"\n👤 {owner}")
             print(f"   Quiet Hours: {user_qh.get('start_time', 'N/A')} ({user_qh.get('timezone', 'N/A')})")
             if quiet_info.get('quiet_start') and quiet_info.get('quiet_end'):
-                start_time = datetime.fromisoformat(quiet_info['quiet_start'])
-                end_time = datetime.fromisoformat(quiet_info['quiet_end'])
-                print(f"   Current Period: {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}")
+                # ISO timestamps carry HH:MM at a fixed offset ("YYYY-MM-DDTHH:MM...")
+                print(f"   Current Period: {quiet_info['quiet_start'][11:16]} - {quiet_info['quiet_end'][11:16]}")
             print("-" * 60)
             
             # Create table for user's workspaces
@@ -404,13 +509,6 @@ class PruneWorkspacesAgent:
             for ws in user_workspaces:
                 status = ws.get('latest_build', {}).get('status', 'Unknown')
                 template_id = ws.get('template_id', 'Unknown')
-                
-                # Get template name
-                template_map = getattr(self.controller, '_template_map', None)
-                if not template_map:
-                    self.controller._template_map = self.controller.get_template_map()
-                    template_map = self.controller._template_map
-                
                 template_name = template_map.get(template_id, template_id)
                 
                 table_data.append([
@@ -436,6 +534,9 @@ class PruneWorkspacesAgent:
         Returns:
             Dictionary mapping workspace_id to success status
         """
+        # Workspace states are about to change; later listings must not be served from cache
+        self.controller.invalidate_cache('/api/v2/workspaces')
+        
         if not workspaces:
             print("\n✅ No workspaces to cleanup")
             return {}
@@ -454,28 +555,41 @@ class PruneWorkspacesAgent:
         print("-" * 60)
         
         results = {}
+        summaries = {}
         for ws in running_workspaces:
             workspace_id = ws['id']
-            summary = self.controller.workspace_summary(ws)
+            summary = summaries[workspace_id] = self.controller.workspace_summary(ws)
             owner = ws.get('owner_name', 'Unknown')
             
             if self.dry_run:
                 print(f"  🧪 [DRY RUN] Would stop: {summary}")
-                print(f"     Owner: {owner}")
-                print(f"     Reason: {reason}")
                 results[workspace_id] = True
             else:
                 print(f"  🛑 Stopping: {summary}")
-                print(f"     Owner: {owner}")
-                print(f"     Reason: {reason}")
-                success = self.controller.stop_workspace(workspace_id, reason)
+            print(f"     Owner: {owner}")
+            print(f"     Reason: {reason}")
+        
+        if self.dry_run:
+            return results
+        
+        # Each stop is an independent API round-trip, so dispatch them concurrently
+        with ThreadPoolExecutor(max_workers=min(16, len(running_workspaces))) as executor:
+            futures = {
+                executor.submit(self.controller.stop_workspace, ws['id'], reason): ws['id']
+                for ws in running_workspaces
+            }
+            for future in as_completed(futures):
+                workspace_id = futures[future]
+                success = future.result()
                 results[workspace_id] = success
-                print(f"     Result: {'✅ Success' if success else '❌ Failed'}")
+                print(f"     Result for {summaries[workspace_id]}: {'✅ Success' if success else '❌ Failed'}")
         
         return results
 
 def main():
     """Main function with command line interface"""
+    import argparse
+    
     parser = argparse.ArgumentParser(description="Coder Prune Workspaces Agent")
     parser.add_argument("--config", default="agents_config.json",
                        help="Configuration file path")
@@ -491,6 +605,8 @@ def main():
                        help="Show what would be done without executing")
     parser.add_argument("--json", action="store_true",
                        help="Output results in JSON format")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Bypass the on-disk cache of quiet hours schedules")
     
     # Organization filters
     parser.add_argument("--include-org", action="append", dest="include_organizations",
@@ -526,36 +642,28 @@ def main():
         if args.dry_run:
             agent.dry_run = True
         
+        if args.no_cache:
+            agent.controller.disk_cache_enabled = False
+        
+        if args.cleanup and not agent.dry_run:
+            # Never stop workspaces based on a schedule the user may have changed since
+            agent.use_schedule_cache = False
+        
         # Validate connection
         if not agent.controller.validate_connection():
             print("Error: Could not connect to Coder API")
             sys.exit(1)
         
         # Build custom filters from command line arguments
-        custom_filters = {}
-        if args.include_organizations:
-            custom_filters['include_organizations'] = args.include_organizations
-        if args.exclude_organizations:
-            custom_filters['exclude_organizations'] = args.exclude_organizations
-        if args.include_groups:
-            custom_filters['include_groups'] = args.include_groups
-        if args.exclude_groups:
-            custom_filters['exclude_groups'] = args.exclude_groups
-        if args.include_users:
-            custom_filters['include_users'] = args.include_users
-        if args.exclude_users:
-            custom_filters['exclude_users'] = args.exclude_users
-        if args.include_templates:
-            custom_filters['include_templates'] = args.include_templates
-        if args.exclude_templates:
-            custom_filters['exclude_templates'] = args.exclude_templates
+        custom_filters = {key: getattr(args, key) for key in FILTER_KEYS if getattr(args, key)}
         
         # Get workspaces in quiet hours
         workspaces = agent.get_workspaces_in_quiet_hours(
             target_user=args.user,
             quiet_hours_duration=args.duration,
             include_all_users=args.all,
-            custom_filters=custom_filters if custom_filters else None
+            custom_filters=custom_filters if custom_filters else None,
+            running_only=args.cleanup
         )
         
         if args.json:
@@ -568,7 +676,7 @@ def main():
                 "total_workspaces": len(workspaces),
                 "workspaces": workspaces
             }
-            print(json.dumps(output, indent=2, default=str))
+            dump_json(output)
         else:
             # Human-readable output
             agent.print_workspaces_in_quiet_hours(workspaces)
@@ -597,7 +705,7 @@ def main():
                     "failed": total_count - success_count,
                     "results": results
                 }
-                print(json.dumps(cleanup_summary, indent=2), file=sys.stderr)
+                dump_json(cleanup_summary, sys.stderr)
     
     except Exception as e:
         print(f"Error: {e}")
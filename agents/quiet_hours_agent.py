@@ -5,30 +5,102 @@ Extends the coder-audit-simple project with intelligent workspace stopping
 """
 
 import argparse
+import contextvars
+import copy
 import json
 import os
 import sys
-from datetime import datetime, timezone, timedelta
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, tzinfo, time as time_of_day
+from functools import cached_property, lru_cache, wraps
 from typing import List, Dict, Optional
 import pytz
 
 # Import the workspace controller
 from workspace_controller import WorkspaceController
 
+# Titles of the per-workspace TTL listings printed by print_workspace_categories
+CATEGORY_TITLES = (
+    ("quiet_hours_stopping", "🛑 QUIET HOURS - STOPPING NOW"),
+    ("quiet_hours_grace", "⏰ QUIET HOURS - GRACE PERIOD"),
+    ("past_quiet_hours_end", "🌅 RUNNING PAST QUIET HOURS END"),
+    ("ttl_expired", "💀 TTL EXPIRED - SHOULD HAVE STOPPED"),
+    ("normal_running", "✅ RUNNING NORMALLY")
+)
+
+# Parsed config files keyed by path, as ((st_mtime_ns, st_size), config)
+_CONFIG_CACHE: Dict[str, tuple] = {}
+
+@dataclass(frozen=True)
+class QuietHoursSettings:
+    """Quiet hours configuration parsed once for the hot-path checks"""
+    enabled: bool
+    start_time: time_of_day
+    end_time: time_of_day
+    start_sec: int
+    end_sec: int
+    overnight: bool
+    grace_period: timedelta
+    tz: tzinfo
+    excluded_users: frozenset
+    excluded_templates: frozenset
+
+@dataclass(frozen=True)
+class TTLInfo:
+    """TTL status of a running workspace, kept beside (not inside) the API workspace dict"""
+    __slots__ = ('deadline', 'time_remaining', 'seconds_remaining', 'is_expired')
+    deadline: Optional[str]
+    time_remaining: str
+    seconds_remaining: int
+    is_expired: bool
+
+@lru_cache(maxsize=4096)
+def _deadline_timestamp(deadline_str: str) -> float:
+    """Epoch time of an ISO 8601 deadline, memoized across categorization passes"""
+    return datetime.fromisoformat(deadline_str.replace('Z', '+00:00')).timestamp()
+
+def _seconds_of_day(moment: datetime) -> float:
+    """Seconds since midnight of a datetime's wall-clock time"""
+    return moment.hour * 3600 + moment.minute * 60 + moment.second + moment.microsecond / 1e6
+
+def _batched(method):
+    """Run an agent method inside agent.batch() so nested categorizations are shared"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.batch():
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class QuietHoursAgent:
     """Agent for managing workspaces during quiet hours"""
     
-    def __init__(self, config_file: str = "agents_config.json"):
+    def __init__(self, config_file: str = "agents_config.json",
+                 controller: WorkspaceController = None):
         """
         Initialize quiet hours agent
         
         Args:
             config_file: Path to configuration file
+            controller: Shared WorkspaceController (a new one is created if omitted)
         """
         self.config = self._load_config(config_file)
-        self.controller = WorkspaceController()
+        self.controller = controller or WorkspaceController()
         self.dry_run = self.config.get('dry_run', False)
         
+        # categorize_workspaces() result shared within a batch() block
+        self._in_batch = False
+        self._categories_cache: Optional[Dict[str, List[Dict]]] = None
+        
+        # TTL status from the latest categorization, keyed by workspace ID
+        self._ttl_by_id: Dict[str, TTLInfo] = {}
+        
+        # Workspace summaries from the latest categorization, keyed by workspace ID
+        # (kept out of the workspace dicts, which are shared via the controller cache)
+        self._summary_by_id: Dict[str, str] = {}
+        
         # Validate configuration
         self._validate_config()
     
@@ -51,17 +123,13 @@ class QuietHoursAgent:
             }
         }
         
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, 'r') as f:
-                    file_config = json.load(f)
-                    # Merge with defaults
-                    default_config.update(file_config)
-            except Exception as e:
-                print(f"Warning: Could not load config file {config_file}: {e}")
-                print("Using default configuration")
-        
-        # Override with environment variables if present
+        file_config = self._read_config_file(config_file)
+        if file_config:
+            # Merge with defaults
+            default_config.update(file_config)
+        
+        # Override with environment variables if present (never cached, the
+        # environment can change between runs)
         env_overrides = {
             "start_time": os.environ.get("QUIET_HOURS_START"),
             "end_time": os.environ.get("QUIET_HOURS_END"),
@@ -81,35 +149,89 @@ class QuietHoursAgent:
         
         return default_config
     
+    def _read_config_file(self, config_file: str) -> Optional[Dict]:
+        """
+        Read and parse a config file, reusing the parsed result while the file is unchanged
+        
+        Args:
+            config_file: Path to configuration file
+            
+        Returns:
+            Copy of the parsed configuration, or None if missing or unreadable
+        """
+        try:
+            st = os.stat(config_file)
+        except OSError:
+            return None
+        
+        signature = (st.st_mtime_ns, st.st_size)
+        cached = _CONFIG_CACHE.get(config_file)
+        if cached and cached[0] == signature:
+            return copy.deepcopy(cached[1])
+        
+        try:
+            with open(config_file, 'r') as f:
+                file_config = json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not load config file {config_file}: {e}")
+            print("Using default configuration")
+            return None
+        
+        _CONFIG_CACHE[config_file] = (signature, file_config)
+        return copy.deepcopy(file_config)
+    
+    @classmethod
+    def flush_config_cache(cls):
+        """Forget all parsed config files so the next agent re-reads them from disk"""
+        _CONFIG_CACHE.clear()
+    
     def _validate_config(self):
-        """Validate configuration parameters"""
+        """Validate configuration parameters and derive the settings used by the checks"""
         qh_config = self.config["quiet_hours"]
         
         # Validate time format
         try:
-            datetime.strptime(qh_config["start_time"], "%H:%M")
-            datetime.strptime(qh_config["end_time"], "%H:%M")
+            start_time = datetime.strptime(qh_config["start_time"], "%H:%M").time()
+            end_time = datetime.strptime(qh_config["end_time"], "%H:%M").time()
         except ValueError as e:
             raise ValueError(f"Invalid time format in configuration: {e}")
         
         # Validate timezone
         try:
-            pytz.timezone(qh_config["timezone"])
+            tz = pytz.timezone(qh_config["timezone"])
         except pytz.exceptions.UnknownTimeZoneError as e:
             raise ValueError(f"Invalid timezone in configuration: {e}")
         
         # Validate grace period
         if qh_config["grace_period_hours"] < 0:
             raise ValueError("Grace period cannot be negative")
+        
+        # Window bounds as seconds since midnight for plain numeric comparisons;
+        # overnight quiet hours (e.g., 18:00 to 08:00) wrap past midnight
+        start_sec = start_time.hour * 3600 + start_time.minute * 60
+        end_sec = end_time.hour * 3600 + end_time.minute * 60
+        
+        self.settings = QuietHoursSettings(
+            enabled=qh_config["enabled"],
+            start_time=start_time,
+            end_time=end_time,
+            start_sec=start_sec,
+            end_sec=end_sec,
+            overnight=start_sec > end_sec,
+            grace_period=timedelta(hours=qh_config["grace_period_hours"]),
+            tz=tz,
+            excluded_users=frozenset(qh_config["excluded_users"]),
+            excluded_templates=frozenset(qh_config["excluded_templates"])
+        )
+    
+    def _rebind_timezone(self):
+        """Re-validate and re-resolve the timezone after config["quiet_hours"]["timezone"] changes"""
+        self._validate_config()
+        self.refresh()
     
     def _get_current_time(self) -> datetime:
         """Get current time in configured timezone"""
-        tz = pytz.timezone(self.config["quiet_hours"]["timezone"])
-        return datetime.now(tz)
-    
-    def _parse_time(self, time_str: str) -> datetime.time:
-        """Parse time string to time object"""
-        return datetime.strptime(time_str, "%H:%M").time()
+        return datetime.now(self.settings.tz)
     
     def is_quiet_hours(self, check_time: datetime = None) -> bool:
         """
@@ -121,28 +243,24 @@ class QuietHoursAgent:
         Returns:
             True if within quiet hours, False otherwise
         """
-        if not self.config["quiet_hours"]["enabled"]:
+        if not self.settings.enabled:
             return False
         
         if check_time is None:
             check_time = self._get_current_time()
         
-        qh_config = self.config["quiet_hours"]
-        start_time = self._parse_time(qh_config["start_time"])
-        end_time = self._parse_time(qh_config["end_time"])
-        current_time = check_time.time()
+        current_sec = _seconds_of_day(check_time)
         
         # Handle overnight quiet hours (e.g., 18:00 to 08:00)
-        if start_time > end_time:
-            return current_time >= start_time or current_time <= end_time
+        if self.settings.overnight:
+            return current_sec >= self.settings.start_sec or current_sec <= self.settings.end_sec
         else:
-            return start_time <= current_time <= end_time
+            return self.settings.start_sec <= current_sec <= self.settings.end_sec
     
-    def get_quiet_hours_start_today(self) -> datetime:
+    def get_quiet_hours_start_today(self, check_time: datetime = None) -> datetime:
         """Get the quiet hours start time for today"""
-        current = self._get_current_time()
-        qh_config = self.config["quiet_hours"]
-        start_time = self._parse_time(qh_config["start_time"])
+        current = check_time or self._get_current_time()
+        start_time = self.settings.start_time
         
         # Create datetime for today's quiet hours start
         start_datetime = current.replace(
@@ -153,32 +271,63 @@ class QuietHoursAgent:
         )
         
         # If quiet hours start time has passed today, it refers to yesterday's start
-        if current.time() < start_time:
+        if _seconds_of_day(current) < self.settings.start_sec:
             start_datetime -= timedelta(days=1)
         
         return start_datetime
     
-    def is_grace_period_over(self) -> bool:
+    def is_grace_period_over(self, check_time: datetime = None) -> bool:
         """
         Check if grace period after quiet hours start has ended
         
+        Args:
+            check_time: Time to check (defaults to current time)
+            
         Returns:
             True if grace period is over and workspaces should be stopped
         """
-        if not self.is_quiet_hours():
+        current = check_time or self._get_current_time()
+        if not self.is_quiet_hours(current):
             return False
         
-        quiet_start = self.get_quiet_hours_start_today()
-        grace_period = timedelta(hours=self.config["quiet_hours"]["grace_period_hours"])
-        grace_end = quiet_start + grace_period
+        quiet_start = self.get_quiet_hours_start_today(current)
+        grace_end = quiet_start + self.settings.grace_period
         
-        current = self._get_current_time()
         return current >= grace_end
     
-    def _format_time_remaining(self, deadline_str: str) -> tuple:
+    @cached_property
+    def current_time(self) -> datetime:
+        """Current time in the configured timezone, captured once per run"""
+        return self._get_current_time()
+    
+    @cached_property
+    def quiet_hours_active(self) -> bool:
+        """Whether quiet hours are active at current_time"""
+        return self.is_quiet_hours(self.current_time)
+    
+    @cached_property
+    def grace_period_over(self) -> bool:
+        """Whether the grace period has ended at current_time"""
+        return self.is_grace_period_over(self.current_time)
+    
+    @cached_property
+    def past_quiet_hours_end(self) -> bool:
+        """Whether current_time is past the quiet hours end"""
+        return self.is_past_quiet_hours_end(self.current_time)
+    
+    def refresh(self):
+        """Discard the cached time snapshot so the next check uses the current time"""
+        for attr in ("current_time", "quiet_hours_active", "grace_period_over", "past_quiet_hours_end"):
+            self.__dict__.pop(attr, None)
+    
+    def _format_time_remaining(self, deadline_str: str, now_ts: float = None) -> tuple:
         """
         Format time remaining until deadline
         
+        Args:
+            deadline_str: ISO 8601 deadline
+            now_ts: Current epoch time shared across a pass (defaults to now)
+            
         Returns:
             Tuple of (formatted_string, seconds_remaining, is_expired)
         """
@@ -186,50 +335,46 @@ class QuietHoursAgent:
             return "N/A", 0, False
         
         try:
-            deadline = datetime.fromisoformat(deadline_str.replace('Z', '+00:00'))
-            now = datetime.now(timezone.utc)
-            remaining = deadline - now
-            seconds_remaining = int(remaining.total_seconds())
-            
-            if seconds_remaining < 0:
-                # Expired
-                abs_seconds = abs(seconds_remaining)
-                if abs_seconds < 3600:
-                    return f"Expired {abs_seconds // 60}m ago", seconds_remaining, True
-                elif abs_seconds < 86400:
-                    hours = abs_seconds // 3600
-                    minutes = (abs_seconds % 3600) // 60
-                    return f"Expired {hours}h {minutes}m ago", seconds_remaining, True
-                else:
-                    days = abs_seconds // 86400
-                    hours = (abs_seconds % 86400) // 3600
-                    return f"Expired {days}d {hours}h ago", seconds_remaining, True
-            else:
-                # Not expired
-                if seconds_remaining < 3600:
-                    return f"{seconds_remaining // 60}m", seconds_remaining, False
-                elif seconds_remaining < 86400:
-                    hours = seconds_remaining // 3600
-                    minutes = (seconds_remaining % 3600) // 60
-                    return f"{hours}h {minutes}m", seconds_remaining, False
-                else:
-                    days = seconds_remaining // 86400
-                    hours = (seconds_remaining % 86400) // 3600
-                    return f"{days}d {hours}h", seconds_remaining, False
-                    
+            deadline_ts = _deadline_timestamp(deadline_str)
+            if now_ts is None:
+                now_ts = time.time()
+            return self._format_seconds_remaining(int(deadline_ts - now_ts))
         except Exception as e:
             return f"Invalid: {e}", 0, False
     
-    def is_past_quiet_hours_end(self) -> bool:
+    def _format_seconds_remaining(self, seconds_remaining: int) -> tuple:
+        """
+        Format a number of seconds remaining until a deadline
+        
+        Returns:
+            Tuple of (formatted_string, seconds_remaining, is_expired)
+        """
+        if seconds_remaining < 0:
+            return f"Expired {self._format_duration(-seconds_remaining)} ago", seconds_remaining, True
+        return self._format_duration(seconds_remaining), seconds_remaining, False
+    
+    def _format_duration(self, seconds: int) -> str:
+        """Format a non-negative duration as Xd Yh, Xh Ym or Xm"""
+        days, rem = divmod(seconds, 86400)
+        hours, rem = divmod(rem, 3600)
+        if days:
+            return f"{days}d {hours}h"
+        if hours:
+            return f"{hours}h {rem // 60}m"
+        return f"{rem // 60}m"
+    
+    def is_past_quiet_hours_end(self, check_time: datetime = None) -> bool:
         """
         Check if current time is past the quiet hours end time
         
+        Args:
+            check_time: Time to check (defaults to current time)
+            
         Returns:
             True if past quiet hours end time
         """
-        current = self._get_current_time()
-        qh_config = self.config["quiet_hours"]
-        end_time = self._parse_time(qh_config["end_time"])
+        current = check_time or self._get_current_time()
+        end_time = self.settings.end_time
         
         # Create datetime for today's quiet hours end
         end_datetime = current.replace(
@@ -240,15 +385,34 @@ class QuietHoursAgent:
         )
         
         # Handle overnight quiet hours
-        start_time = self._parse_time(qh_config["start_time"])
-        if start_time > end_time:
+        if self.settings.overnight:
             # Overnight quiet hours - end time is next day
-            if current.time() >= start_time:
+            if _seconds_of_day(current) >= self.settings.start_sec:
                 # We're after start time, so end time is tomorrow
                 end_datetime += timedelta(days=1)
         
         return current > end_datetime
     
+    @contextmanager
+    def batch(self):
+        """
+        Reuse a single categorize_workspaces() result for the duration of the block
+        
+        The outermost block takes a fresh time snapshot; nested blocks share
+        its result and clock.
+        """
+        outer = self._in_batch
+        if not outer:
+            self.refresh()
+        self._in_batch = True
+        try:
+            yield self
+        finally:
+            if not outer:
+                self._in_batch = False
+                self._categories_cache = None
+    
+    @_batched
     def categorize_workspaces(self) -> Dict[str, List[Dict]]:
         """
         Categorize all running workspaces based on quiet hours and TTL status
@@ -256,7 +420,8 @@ class QuietHoursAgent:
         Returns:
             Dictionary with categorized workspace lists
         """
-        qh_config = self.config["quiet_hours"]
+        if self._categories_cache is not None:
+            return self._categories_cache
         
         # Get all running workspaces
         all_running = self.controller.get_running_workspaces()
@@ -264,10 +429,14 @@ class QuietHoursAgent:
         # Filter out excluded users and templates for quiet hours analysis
         quiet_hours_eligible = []
         excluded_workspaces = []
+        summary_by_id = {}
         
         for ws in all_running:
-            if (ws.get('owner_name') in qh_config["excluded_users"] or 
-                ws.get('template_id') in qh_config["excluded_templates"]):
+            # Summarize once here; listings, stops and reports reuse it
+            summary_by_id[ws.get('id')] = self.controller.workspace_summary(ws)
+            
+            if (ws.get('owner_name') in self.settings.excluded_users or 
+                ws.get('template_id') in self.settings.excluded_templates):
                 excluded_workspaces.append(ws)
             else:
                 quiet_hours_eligible.append(ws)
@@ -282,22 +451,25 @@ class QuietHoursAgent:
             "excluded": excluded_workspaces  # Excluded from quiet hours
         }
         
-        is_quiet = self.is_quiet_hours()
-        grace_over = self.is_grace_period_over()
-        past_end = self.is_past_quiet_hours_end()
+        if self.settings.enabled:
+            is_quiet = self.quiet_hours_active
+            grace_over = self.grace_period_over
+            past_end = self.past_quiet_hours_end
+        else:
+            # Quiet hours disabled: only TTL status matters, skip the time-of-day checks
+            is_quiet = grace_over = past_end = False
+        
+        # Measure every TTL against the batch's time snapshot; repeated deadlines
+        # are parsed once thanks to the _deadline_timestamp cache
+        now_ts = self.current_time.timestamp()
+        ttl_by_id = {}
         
         for ws in quiet_hours_eligible:
             # Check TTL status
             deadline = ws.get('latest_build', {}).get('deadline')
-            time_remaining, seconds_remaining, is_expired = self._format_time_remaining(deadline)
+            time_remaining, seconds_remaining, is_expired = self._format_time_remaining(deadline, now_ts)
             
-            # Add TTL info to workspace
-            ws['ttl_info'] = {
-                'deadline': deadline,
-                'time_remaining': time_remaining,
-                'seconds_remaining': seconds_remaining,
-                'is_expired': is_expired
-            }
+            ttl_by_id[ws['id']] = TTLInfo(deadline, time_remaining, seconds_remaining, is_expired)
             
             # Categorize based on status
             if is_expired:
@@ -311,8 +483,40 @@ class QuietHoursAgent:
             else:
                 categories["normal_running"].append(ws)
         
+        self._ttl_by_id = ttl_by_id
+        self._summary_by_id = summary_by_id
+        if self._in_batch:
+            self._categories_cache = categories
+        
         return categories
     
+    def ttl_info(self, workspace: Dict) -> Optional[TTLInfo]:
+        """
+        Get the TTL status recorded for a workspace by the latest categorization
+        
+        Args:
+            workspace: Workspace dictionary
+            
+        Returns:
+            TTLInfo, or None if the workspace was not TTL-checked (e.g. excluded)
+        """
+        return self._ttl_by_id.get(workspace.get('id'))
+    
+    def summary(self, workspace: Dict) -> str:
+        """
+        Get the summary recorded for a workspace by the latest categorization
+        
+        Args:
+            workspace: Workspace dictionary
+            
+        Returns:
+            Human-readable workspace summary
+        """
+        summary = self._summary_by_id.get(workspace.get('id'))
+        if summary is None:
+            summary = self.controller.workspace_summary(workspace)
+        return summary
+    
     def get_workspaces_to_stop(self) -> List[Dict]:
         """
         Get list of workspaces that should be stopped during quiet hours
@@ -333,96 +537,67 @@ class QuietHoursAgent:
         categories = self.categorize_workspaces()
         return categories["ttl_expired"]
     
+    @_batched
     def print_workspace_categories(self):
         """
         Print detailed categorization of all workspaces
         """
         categories = self.categorize_workspaces()
         
-        print("\n" + "=" * 80)
-        print("WORKSPACE CATEGORIZATION")
-        print("=" * 80)
+        lines = ["\n" + "=" * 80, "WORKSPACE CATEGORIZATION", "=" * 80]
         
-        # Quiet hours stopping
-        if categories["quiet_hours_stopping"]:
-            print(f"\n🛑 QUIET HOURS - STOPPING NOW ({len(categories['quiet_hours_stopping'])})")
-            print("-" * 60)
-            for ws in categories["quiet_hours_stopping"]:
-                ttl_info = ws.get('ttl_info', {})
-                print(f"  • {self.controller.workspace_summary(ws)}")
-                print(f"    TTL: {ttl_info.get('time_remaining', 'N/A')}")
-        
-        # Quiet hours grace period
-        if categories["quiet_hours_grace"]:
-            print(f"\n⏰ QUIET HOURS - GRACE PERIOD ({len(categories['quiet_hours_grace'])})")
-            print("-" * 60)
-            for ws in categories["quiet_hours_grace"]:
-                ttl_info = ws.get('ttl_info', {})
-                print(f"  • {self.controller.workspace_summary(ws)}")
-                print(f"    TTL: {ttl_info.get('time_remaining', 'N/A')}")
-        
-        # Past quiet hours end
-        if categories["past_quiet_hours_end"]:
-            print(f"\n🌅 RUNNING PAST QUIET HOURS END ({len(categories['past_quiet_hours_end'])})")
-            print("-" * 60)
-            for ws in categories["past_quiet_hours_end"]:
-                ttl_info = ws.get('ttl_info', {})
-                print(f"  • {self.controller.workspace_summary(ws)}")
-                print(f"    TTL: {ttl_info.get('time_remaining', 'N/A')}")
-        
-        # TTL expired
-        if categories["ttl_expired"]:
-            print(f"\n💀 TTL EXPIRED - SHOULD HAVE STOPPED ({len(categories['ttl_expired'])})")
-            print("-" * 60)
-            for ws in categories["ttl_expired"]:
-                ttl_info = ws.get('ttl_info', {})
-                print(f"  • {self.controller.workspace_summary(ws)}")
-                print(f"    TTL: {ttl_info.get('time_remaining', 'N/A')}")
-        
-        # Normal running
-        if categories["normal_running"]:
-            print(f"\n✅ RUNNING NORMALLY ({len(categories['normal_running'])})")
-            print("-" * 60)
-            for ws in categories["normal_running"]:
-                ttl_info = ws.get('ttl_info', {})
-                print(f"  • {self.controller.workspace_summary(ws)}")
-                print(f"    TTL: {ttl_info.get('time_remaining', 'N/A')}")
+        for key, title in CATEGORY_TITLES:
+            if categories[key]:
+                lines.append(f"\n{title} ({len(categories[key])})")
+                lines.append("-" * 60)
+                for ws in categories[key]:
+                    lines.append(f"  • {self.summary(ws)}")
+                    lines.append(f"    TTL: {self._ttl_by_id[ws['id']].time_remaining}")
         
         # Excluded
         if categories["excluded"]:
-            print(f"\n🚫 EXCLUDED FROM QUIET HOURS ({len(categories['excluded'])})")
-            print("-" * 60)
+            lines.append(f"\n🚫 EXCLUDED FROM QUIET HOURS ({len(categories['excluded'])})")
+            lines.append("-" * 60)
             for ws in categories["excluded"]:
-                print(f"  • {self.controller.workspace_summary(ws)}")
-                reason = "User excluded" if ws.get('owner_name') in self.config["quiet_hours"]["excluded_users"] else "Template excluded"
-                print(f"    Reason: {reason}")
+                lines.append(f"  • {self.summary(ws)}")
+                reason = "User excluded" if ws.get('owner_name') in self.settings.excluded_users else "Template excluded"
+                lines.append(f"    Reason: {reason}")
+        
+        lines.append("\n" + "=" * 80)
         
-        print("\n" + "=" * 80)
+        # Emit the whole listing with a single write
+        sys.stdout.write("\n".join(lines) + "\n")
     
-    def stop_workspaces_for_quiet_hours(self, force_ttl: bool = False) -> Dict[str, bool]:
+    @_batched
+    def stop_workspaces_for_quiet_hours(self, force_ttl: bool = False,
+                                        max_parallel: int = 16) -> Dict[str, bool]:
         """
         Stop workspaces for quiet hours and optionally force stop TTL-expired workspaces
         
         Args:
             force_ttl: If True, also stop workspaces that have exceeded their TTL
+            max_parallel: Maximum number of stop requests in flight at once
             
         Returns:
             Dictionary mapping workspace_id to success status
         """
         results = {}
         
+        # Decide what to stop from the live workspace list, not a cached one
+        self.controller.invalidate_cache('/api/v2/workspaces')
+        
         # Get workspace categories
         categories = self.categorize_workspaces()
         
         # Print categorization
         self.print_workspace_categories()
         
-        # Determine which workspaces to stop
+        # Determine which workspaces to stop (stop_reasons doubles as the set of IDs seen)
         workspaces_to_stop = []
         stop_reasons = {}
         
         # Add quiet hours workspaces if grace period is over
-        if self.is_grace_period_over():
+        if self.grace_period_over:
             for ws in categories["quiet_hours_stopping"]:
                 workspaces_to_stop.append(ws)
                 stop_reasons[ws['id']] = "Quiet hours policy"
@@ -430,15 +605,15 @@ class QuietHoursAgent:
         # Add TTL expired workspaces if force flag is set
         if force_ttl:
             for ws in categories["ttl_expired"]:
-                if ws not in workspaces_to_stop:  # Avoid duplicates
+                if ws['id'] not in stop_reasons:  # Avoid duplicates
                     workspaces_to_stop.append(ws)
                     stop_reasons[ws['id']] = "TTL expired"
         
         if not workspaces_to_stop:
-            if not self.is_grace_period_over() and not force_ttl:
+            if not self.grace_period_over and not force_ttl:
                 print("\n⏰ Grace period not over yet, no workspaces will be stopped")
                 print("💡 Use --force to stop TTL-expired workspaces regardless of quiet hours")
-            elif not self.is_grace_period_over() and force_ttl and not categories["ttl_expired"]:
+            elif not self.grace_period_over and force_ttl and not categories["ttl_expired"]:
                 print("\n✅ No TTL-expired workspaces found to force stop")
             else:
                 print("\n✅ No workspaces to stop")
@@ -449,28 +624,42 @@ class QuietHoursAgent:
         
         for ws in workspaces_to_stop:
             workspace_id = ws['id']
-            summary = self.controller.workspace_summary(ws)
+            summary = self.summary(ws)
             reason = stop_reasons[workspace_id]
-            ttl_info = ws.get('ttl_info', {})
+            ttl = self.ttl_info(ws)
             
             if self.dry_run:
                 print(f"  🧪 [DRY RUN] Would stop: {summary}")
-                print(f"     Reason: {reason}")
-                print(f"     TTL: {ttl_info.get('time_remaining', 'N/A')}")
                 results[workspace_id] = True
             else:
                 print(f"  🛑 Stopping: {summary}")
-                print(f"     Reason: {reason}")
-                print(f"     TTL: {ttl_info.get('time_remaining', 'N/A')}")
-                success = self.controller.stop_workspace(
-                    workspace_id, 
-                    f"Automated stop - {reason.lower()}"
-                )
-                results[workspace_id] = success
-                print(f"     Result: {'✅ Success' if success else '❌ Failed'}")
+            print(f"     Reason: {reason}")
+            print(f"     TTL: {ttl.time_remaining if ttl else 'N/A'}")
+        
+        if self.dry_run:
+            return results
+        
+        # Stops are independent API round-trips, so overlap them (each in a copy
+        # of our context, so context-local state follows it into the pool thread)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(workspaces_to_stop)))) as executor:
+            futures = {
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self.controller.stop_workspace,
+                    ws['id'],
+                    f"Automated stop - {stop_reasons[ws['id']].lower()}"
+                ): ws
+                for ws in workspaces_to_stop
+            }
+            for future in as_completed(futures):
+                ws = futures[future]
+                success = future.result()
+                results[ws['id']] = success
+                print(f"     Result for {self.summary(ws)}: {'✅ Success' if success else '❌ Failed'}")
         
         return results
     
+    @_batched
     def generate_report(self) -> Dict:
         """
         Generate a comprehensive quiet hours report
@@ -478,17 +667,19 @@ class QuietHoursAgent:
         Returns:
             Report dictionary with current status and recommendations
         """
-        current_time = self._get_current_time()
-        is_quiet = self.is_quiet_hours()
-        grace_over = self.is_grace_period_over()
-        workspaces_to_stop = self.get_workspaces_to_stop()
+        current_time = self.current_time
+        is_quiet = self.quiet_hours_active
+        grace_over = self.grace_period_over
+        categories = self.categorize_workspaces()
+        workspaces_to_stop = categories["quiet_hours_stopping"]
         
         report = {
             "timestamp": current_time.isoformat(),
             "timezone": self.config["quiet_hours"]["timezone"],
             "quiet_hours_active": is_quiet,
             "grace_period_over": grace_over,
-            "workspaces_running": len(self.controller.get_running_workspaces()),
+            # Every running workspace lands in exactly one category
+            "workspaces_running": sum(len(group) for group in categories.values()),
             "workspaces_to_stop": len(workspaces_to_stop),
             "excluded_users": self.config["quiet_hours"]["excluded_users"],
             "excluded_templates": self.config["quiet_hours"]["excluded_templates"],
@@ -503,12 +694,12 @@ class QuietHoursAgent:
                 "name": ws.get('name'),
                 "template_id": ws.get('template_id'),
                 "status": ws.get('latest_build', {}).get('status'),
-                "summary": self.controller.workspace_summary(ws)
+                "summary": self.summary(ws)
             })
         
         if is_quiet:
-            quiet_start = self.get_quiet_hours_start_today()
-            grace_end = quiet_start + timedelta(hours=self.config["quiet_hours"]["grace_period_hours"])
+            quiet_start = self.get_quiet_hours_start_today(current_time)
+            grace_end = quiet_start + self.settings.grace_period
             
             report["quiet_hours_started"] = quiet_start.isoformat()
             report["grace_period_ends"] = grace_end.isoformat()
@@ -523,40 +714,49 @@ class QuietHoursAgent:
         
         return report
     
+    @_batched
     def print_status(self):
         """Print current quiet hours status"""
         report = self.generate_report()
         
-        print("=" * 60)
-        print("QUIET HOURS AGENT STATUS")
-        print("=" * 60)
-        print(f"Current Time: {report['timestamp']}")
-        print(f"Timezone: {report['timezone']}")
-        print(f"Quiet Hours Active: {'Yes' if report['quiet_hours_active'] else 'No'}")
-        print(f"Grace Period Over: {'Yes' if report['grace_period_over'] else 'No'}")
-        print(f"Running Workspaces: {report['workspaces_running']}")
-        print(f"Workspaces to Stop: {report['workspaces_to_stop']}")
-        print(f"Action Required: {report['action_required']}")
+        lines = [
+            "=" * 60,
+            "QUIET HOURS AGENT STATUS",
+            "=" * 60,
+            f"Current Time: {report['timestamp']}",
+            f"Timezone: {report['timezone']}",
+            f"Quiet Hours Active: {'Yes' if report['quiet_hours_active'] else 'No'}",
+            f"Grace Period Over: {'Yes' if report['grace_period_over'] else 'No'}",
+            f"Running Workspaces: {report['workspaces_running']}",
+            f"Workspaces to Stop: {report['workspaces_to_stop']}",
+            f"Action Required: {report['action_required']}"
+        ]
         
         if report['excluded_users']:
-            print(f"Excluded Users: {', '.join(report['excluded_users'])}")
+            lines.append(f"Excluded Users: {', '.join(report['excluded_users'])}")
         
         if report['excluded_templates']:
-            print(f"Excluded Templates: {', '.join(report['excluded_templates'])}")
+            lines.append(f"Excluded Templates: {', '.join(report['excluded_templates'])}")
         
         if report['workspaces']:
-            print("\nWorkspaces that would be stopped:")
+            lines.append("\nWorkspaces that would be stopped:")
             for ws in report['workspaces']:
-                print(f"  - {ws['summary']}")
+                lines.append(f"  - {ws['summary']}")
         
-        print("=" * 60)
+        lines.append("=" * 60)
+        
+        # Emit the status block with a single write
+        sys.stdout.write("\n".join(lines) + "\n")
         
         # Include enterprise quiet hours information
         print("\n")
         self.controller.print_enterprise_quiet_hours()
 
-def main():
-    """Main function with command line interface"""
+# Command line parser, built on first use and reused by later main() calls
+_PARSER: Optional[argparse.ArgumentParser] = None
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser"""
     parser = argparse.ArgumentParser(description="Coder Quiet Hours Agent")
     parser.add_argument("--config", default="agents_config.json", 
                        help="Configuration file path")
@@ -574,10 +774,22 @@ def main():
                        help="Show enterprise quiet hours configuration only")
     parser.add_argument("--force", action="store_true",
                        help="Force stop workspaces that have exceeded their TTL")
+    parser.add_argument("--max-parallel", type=int, default=16,
+                       help="Maximum concurrent stop requests (default: 16)")
     parser.add_argument("--categorize", action="store_true",
                        help="Show detailed workspace categorization")
-    
-    args = parser.parse_args()
+    return parser
+
+def _get_parser() -> argparse.ArgumentParser:
+    """Get the shared command line parser, building it on first use"""
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = _build_parser()
+    return _PARSER
+
+def main():
+    """Main function with command line interface"""
+    args = _get_parser().parse_args()
     
     try:
         # Initialize agent
@@ -590,7 +802,7 @@ def main():
         # Override timezone if specified
         if args.timezone:
             agent.config["quiet_hours"]["timezone"] = args.timezone
-            agent._validate_config()
+            agent._rebind_timezone()
         
         # Validate connection
         if not agent.controller.validate_connection():
@@ -608,7 +820,10 @@ def main():
         elif args.categorize:
             agent.print_workspace_categories()
         elif args.execute:
-            results = agent.stop_workspaces_for_quiet_hours(force_ttl=args.force)
+            results = agent.stop_workspaces_for_quiet_hours(
+                force_ttl=args.force,
+                max_parallel=args.max_parallel
+            )
             
             success_count = sum(1 for success in results.values() if success)
             total_count = len(results)
@@ -4,32 +4,168 @@ TTL Monitor Agent - Monitor workspace TTL settings and display compliance status
 Extends the coder-audit-simple project with TTL monitoring and prediction
 """
 
-import argparse
+import contextvars
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Optional, Tuple
-from tabulate import tabulate
+from enum import IntEnum
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Dict, NamedTuple, Optional, Tuple
 
 # Import the workspace controller
-from workspace_controller import WorkspaceController
+from workspace_controller import WorkspaceController, dump_json
+
+# Sort key for analyses, by urgency
+_BY_SECONDS_REMAINING = itemgetter("seconds_remaining")
+
+# Entries kept by the timestamp parse/format caches; they live for the whole
+# process so monitor_continuous cycles reuse them (about 2x a large fleet)
+TIMESTAMP_CACHE_SIZE = 4096
+
+# fromisoformat() accepts a trailing 'Z' from Python 3.11 on
+_FROMISOFORMAT_ACCEPTS_Z = sys.version_info >= (3, 11)
+_UTC_OFFSET = "+00:00"
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def _parse_iso(date_str: str) -> datetime:
+    """Parse an ISO 8601 timestamp as returned by the Coder API (memoized: deadlines repeat)"""
+    if not _FROMISOFORMAT_ACCEPTS_Z and date_str.endswith('Z'):
+        date_str = date_str[:-1] + _UTC_OFFSET
+    return datetime.fromisoformat(date_str)
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def _format_date(date_str: str) -> str:
+    """Format an API timestamp as YYYY-MM-DD HH:MM:SS (falls back to the raw string)"""
+    if not date_str or date_str == "0001-01-01T00:00:00Z":
+        return "N/A"
+    try:
+        return _parse_iso(date_str).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return date_str
+
+@lru_cache(maxsize=256)
+def _format_ttl(ttl_ms: int) -> str:
+    """Format a TTL in milliseconds as Xm, Xh, Xd or Xd Yh (memoized: fleets use a few TTLs)"""
+    if not ttl_ms:
+        return "N/A"
+    
+    seconds = ttl_ms / 1000
+    
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m"
+    elif seconds < 86400:
+        return f"{int(seconds // 3600)}h"
+    else:
+        days, rem = divmod(int(seconds), 86400)
+        hours = rem // 3600
+        if hours > 0:
+            return f"{days}d {hours}h"
+        else:
+            return f"{days}d"
+
+class _Status(IntEnum):
+    """Compliance status of a workspace; the value indexes the report buckets"""
+    EXPIRED = 0
+    EXPIRING_SOON = 1
+    RUNNING = 2
+    STOPPED = 3
+
+class WorkspaceRow(NamedTuple):
+    """Compact, read-only view of a TTL analysis for display loops"""
+    owner: str
+    name: str
+    time_remaining: str
+    
+    @classmethod
+    def from_analysis(cls, analysis: Dict) -> "WorkspaceRow":
+        """Build a row from an analyze_workspace_ttl() result"""
+        return cls(analysis["owner"], analysis["name"], analysis["time_remaining"])
 
 class TTLMonitorAgent:
     """Agent for monitoring workspace TTL compliance and predictions"""
     
-    def __init__(self, config_file: str = "agents_config.json"):
+    def __init__(self, config_file: str = "agents_config.json",
+                 controller: WorkspaceController = None):
         """
         Initialize TTL monitor agent
         
         Args:
             config_file: Path to configuration file
+            controller: Shared WorkspaceController (a new one is created if omitted)
         """
         self.config = self._load_config(config_file)
-        self.controller = WorkspaceController()
+        self.controller = controller or WorkspaceController()
+        self._apply_config()
+    
+    def _apply_config(self):
+        """Cache the settings read on every workspace or monitor cycle"""
+        ttl_config = self.config["ttl_monitor"]
+        self._warning_threshold_seconds = int(ttl_config["warning_threshold_hours"] * 3600)
+        self._check_interval_minutes = ttl_config["check_interval_minutes"]
+        self._classify = self._make_classifier(self._warning_threshold_seconds)
+    
+    @staticmethod
+    def _config_signature(config_file: str) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) of the config file, or None if it does not exist"""
+        try:
+            st = os.stat(config_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+    
+    def _maybe_reload_config(self) -> bool:
+        """
+        Reload the config file if it changed since it was last loaded
         
+        Returns:
+            True if the configuration was reloaded
+        """
+        stamp = self._config_signature(self._config_path)
+        if stamp == self._config_stamp:
+            return False
+        
+        try:
+            config = self._read_config(self._config_path)
+        except Exception as e:
+            # Keep running on the previous settings; the unchanged stamp retries next cycle
+            print(f"Warning: Could not reload config file {self._config_path}, keeping previous settings: {e}")
+            return False
+        
+        self.config = config
+        self._config_stamp = stamp
+        self._apply_config()
+        
+        print(f"Reloaded configuration from {self._config_path}")
+        return True
+    
     def _load_config(self, config_file: str) -> Dict:
         """Load configuration from file or use defaults"""
+        # Remember what was loaded so monitor_continuous can pick up edits
+        self._config_path = config_file
+        self._config_stamp = self._config_signature(config_file)
+        
+        try:
+            return self._read_config(config_file)
+        except Exception as e:
+            print(f"Warning: Could not load config file {config_file}: {e}")
+            return self._read_config(None)
+    
+    def _read_config(self, config_file: Optional[str]) -> Dict:
+        """
+        Read the config file over the defaults
+        
+        Args:
+            config_file: Path to configuration file (None or missing for defaults only)
+            
+        Returns:
+            Configuration dictionary
+            
+        Raises:
+            Exception: If the file exists but cannot be read or parsed
+        """
         default_config = {
             "ttl_monitor": {
                 "enabled": True,
@@ -40,22 +176,19 @@ class TTLMonitorAgent:
             }
         }
         
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, 'r') as f:
-                    file_config = json.load(f)
-                    default_config.update(file_config)
-            except Exception as e:
-                print(f"Warning: Could not load config file {config_file}: {e}")
+        if config_file and os.path.exists(config_file):
+            with open(config_file, 'r') as f:
+                default_config.update(json.load(f))
         
         return default_config
     
-    def _format_time_remaining(self, deadline_str: str) -> Tuple[str, int, bool]:
+    def _format_time_remaining(self, deadline_str: str, now: datetime = None) -> Tuple[str, int, bool]:
         """
         Format time remaining until deadline
         
         Args:
             deadline_str: ISO format deadline string
+            now: Current time shared across a report (defaults to now)
             
         Returns:
             Tuple of (formatted_string, seconds_remaining, is_expired)
@@ -64,143 +197,198 @@ class TTLMonitorAgent:
             return "N/A", 0, False
         
         try:
-            deadline = datetime.fromisoformat(deadline_str.replace('Z', '+00:00'))
-            now = datetime.now(timezone.utc)
+            deadline = _parse_iso(deadline_str)
+            if now is None:
+                now = datetime.now(timezone.utc)
             remaining = deadline - now
-            seconds_remaining = int(remaining.total_seconds())
-            
-            if seconds_remaining < 0:
-                # Expired
-                abs_seconds = abs(seconds_remaining)
-                if abs_seconds < 3600:
-                    return f"Expired {abs_seconds // 60}m ago", seconds_remaining, True
-                elif abs_seconds < 86400:
-                    hours = abs_seconds // 3600
-                    minutes = (abs_seconds % 3600) // 60
-                    return f"Expired {hours}h {minutes}m ago", seconds_remaining, True
-                else:
-                    days = abs_seconds // 86400
-                    hours = (abs_seconds % 86400) // 3600
-                    return f"Expired {days}d {hours}h ago", seconds_remaining, True
-            else:
-                # Not expired
-                if seconds_remaining < 3600:
-                    return f"{seconds_remaining // 60}m", seconds_remaining, False
-                elif seconds_remaining < 86400:
-                    hours = seconds_remaining // 3600
-                    minutes = (seconds_remaining % 3600) // 60
-                    return f"{hours}h {minutes}m", seconds_remaining, False
-                else:
-                    days = seconds_remaining // 86400
-                    hours = (seconds_remaining % 86400) // 3600
-                    return f"{days}d {hours}h", seconds_remaining, False
-                    
-        except Exception as e:
+            return self._format_seconds_remaining(int(remaining.total_seconds()))
+        except (ValueError, TypeError) as e:  # Malformed, or a naive timestamp
             return f"Invalid: {e}", 0, False
     
-    def _format_ttl(self, ttl_ms: int) -> str:
-        """Format TTL from milliseconds to human-readable format"""
-        if not ttl_ms:
-            return "N/A"
-        
-        seconds = ttl_ms / 1000
+    def _format_seconds_remaining(self, seconds_remaining: int) -> Tuple[str, int, bool]:
+        """
+        Format a number of seconds remaining until a deadline
         
-        if seconds < 3600:
-            return f"{int(seconds // 60)}m"
-        elif seconds < 86400:
-            return f"{int(seconds // 3600)}h"
+        Returns:
+            Tuple of (formatted_string, seconds_remaining, is_expired)
+        """
+        if seconds_remaining < 0:
+            # Expired
+            abs_seconds = abs(seconds_remaining)
+            if abs_seconds < 3600:
+                return f"Expired {abs_seconds // 60}m ago", seconds_remaining, True
+            elif abs_seconds < 86400:
+                hours, rem = divmod(abs_seconds, 3600)
+                return f"Expired {hours}h {rem // 60}m ago", seconds_remaining, True
+            else:
+                days, rem = divmod(abs_seconds, 86400)
+                return f"Expired {days}d {rem // 3600}h ago", seconds_remaining, True
         else:
-            days = int(seconds // 86400)
-            hours = int((seconds % 86400) // 3600)
-            if hours > 0:
-                return f"{days}d {hours}h"
+            # Not expired
+            if seconds_remaining < 3600:
+                return f"{seconds_remaining // 60}m", seconds_remaining, False
+            elif seconds_remaining < 86400:
+                hours, rem = divmod(seconds_remaining, 3600)
+                return f"{hours}h {rem // 60}m", seconds_remaining, False
             else:
-                return f"{days}d"
+                days, rem = divmod(seconds_remaining, 86400)
+                return f"{days}d {rem // 3600}h", seconds_remaining, False
+    
+    def _format_ttl(self, ttl_ms: int) -> str:
+        """Format TTL from milliseconds to human-readable format"""
+        return _format_ttl(ttl_ms)
     
     def _format_date(self, date_str: str) -> str:
         """Format date string to readable format"""
-        if not date_str or date_str == "0001-01-01T00:00:00Z":
-            return "N/A"
-        try:
-            dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            return dt.strftime("%Y-%m-%d %H:%M:%S")
-        except:
-            return date_str
+        if not isinstance(date_str, str):
+            return "N/A" if not date_str else date_str
+        return _format_date(date_str)
     
-    def analyze_workspace_ttl(self, workspace: Dict) -> Dict:
+    def _ttl_status(self, deadline: Optional[str], seconds_remaining: Optional[int] = None,
+                    now: datetime = None) -> Tuple[str, int, bool]:
+        """Time remaining, seconds remaining and expiry for a deadline (may be missing)"""
+        if not deadline:
+            return "N/A", 0, False
+        if seconds_remaining is not None:
+            return self._format_seconds_remaining(seconds_remaining)
+        return self._format_time_remaining(deadline, now)
+    
+    def _make_classifier(self, threshold_seconds: int):
         """
-        Analyze TTL compliance for a single workspace
+        Build the compliance classifier with the warning threshold bound in
+        
+        Rebuilt whenever the configuration is (re)applied; the statuses and
+        threshold are closure variables, so classifying a workspace does no
+        attribute or config lookups.
+        
+        Args:
+            threshold_seconds: Running workspaces expiring within this many seconds are flagged
+            
+        Returns:
+            Function (workspace, seconds_remaining=None, now=None) returning a tuple of
+            (compliance_status, TTL status tuple or None for stopped workspaces)
+        """
+        ttl_status = self._ttl_status
+        EXPIRED, EXPIRING_SOON, RUNNING, STOPPED = _Status
+        
+        def classify(workspace: Dict, seconds_remaining: Optional[int] = None,
+                     now: datetime = None) -> Tuple[_Status, Optional[Tuple[str, int, bool]]]:
+            # Only running workspaces are flagged as problematic, so stopped
+            # ones skip deadline parsing entirely
+            latest_build = workspace.get('latest_build', {})
+            if latest_build.get('status') != "running":
+                return STOPPED, None
+            
+            ttl = ttl_status(latest_build.get('deadline'), seconds_remaining, now)
+            if ttl[2]:
+                # Only running workspaces with expired TTL are problematic
+                return EXPIRED, ttl
+            if 0 < ttl[1] <= threshold_seconds:
+                # Only running workspaces expiring soon are concerning
+                return EXPIRING_SOON, ttl
+            # Running workspace with normal TTL
+            return RUNNING, ttl
+        
+        return classify
+    
+    def _enrich(self, workspace: Dict, compliance_status: _Status,
+                ttl: Optional[Tuple[str, int, bool]], now: datetime = None,
+                include_details: bool = True) -> Dict:
+        """
+        Build the analysis dictionary for a classified workspace
         
         Args:
             workspace: Workspace dictionary
+            compliance_status: Status from self._classify
+            ttl: TTL status tuple from self._classify (computed here if None)
+            now: Current time shared across a report (defaults to now)
+            include_details: Whether to include IDs, max deadline and timestamps
+                (workspace_id, template_id, max_deadline, created_at, updated_at)
             
         Returns:
             Analysis dictionary with TTL information
         """
-        analysis = {
-            "workspace_id": workspace.get('id'),
-            "owner": workspace.get('owner_name'),
-            "name": workspace.get('name'),
-            "template_id": workspace.get('template_id'),
-            "status": workspace.get('latest_build', {}).get('status'),
-            "ttl_ms": workspace.get('ttl_ms'),
-            "ttl_formatted": self._format_ttl(workspace.get('ttl_ms', 0)),
-            "deadline": workspace.get('latest_build', {}).get('deadline'),
-            "max_deadline": workspace.get('latest_build', {}).get('max_deadline'),
-            "created_at": workspace.get('created_at'),
-            "updated_at": workspace.get('updated_at')
-        }
-        
-        # Analyze deadline
-        deadline = analysis["deadline"]
-        if deadline:
-            time_remaining, seconds_remaining, is_expired = self._format_time_remaining(deadline)
-            analysis.update({
+        # Local aliases: this runs once per listed workspace
+        get = workspace.get
+        build_get = get('latest_build', {}).get
+        deadline = build_get('deadline')
+        if ttl is None:
+            ttl = self._ttl_status(deadline, now=now)
+        time_remaining, seconds_remaining, is_expired = ttl
+        
+        if not include_details:
+            return {
+                "owner": get('owner_name'),
+                "name": get('name'),
+                "status": build_get('status'),
+                "ttl_ms": get('ttl_ms'),
+                "ttl_formatted": self._format_ttl(get('ttl_ms', 0)),
+                "deadline": deadline,
                 "time_remaining": time_remaining,
                 "seconds_remaining": seconds_remaining,
                 "is_expired": is_expired,
-                "deadline_formatted": self._format_date(deadline)
-            })
-        else:
-            analysis.update({
-                "time_remaining": "N/A",
-                "seconds_remaining": 0,
-                "is_expired": False,
-                "deadline_formatted": "N/A"
-            })
-        
-        # Determine compliance status - only flag running workspaces as problematic
-        warning_threshold = self.config["ttl_monitor"]["warning_threshold_hours"] * 3600
-        
-        # First check if workspace is running
-        if analysis["status"] != "running":
-            analysis["compliance_status"] = "STOPPED"
-        elif analysis["is_expired"]:
-            # Only running workspaces with expired TTL are problematic
-            analysis["compliance_status"] = "EXPIRED"
-        elif analysis["seconds_remaining"] > 0 and analysis["seconds_remaining"] <= warning_threshold:
-            # Only running workspaces expiring soon are concerning
-            analysis["compliance_status"] = "EXPIRING_SOON"
-        else:
-            # Running workspace with normal TTL
-            analysis["compliance_status"] = "RUNNING"
+                "deadline_formatted": self._format_date(deadline) if deadline else "N/A",
+                "compliance_status": compliance_status.name
+            }
         
-        return analysis
+        return {
+            "workspace_id": get('id'),
+            "owner": get('owner_name'),
+            "name": get('name'),
+            "template_id": get('template_id'),
+            "status": build_get('status'),
+            "ttl_ms": get('ttl_ms'),
+            "ttl_formatted": self._format_ttl(get('ttl_ms', 0)),
+            "deadline": deadline,
+            "max_deadline": build_get('max_deadline'),
+            "created_at": get('created_at'),
+            "updated_at": get('updated_at'),
+            "time_remaining": time_remaining,
+            "seconds_remaining": seconds_remaining,
+            "is_expired": is_expired,
+            "deadline_formatted": self._format_date(deadline) if deadline else "N/A",
+            "compliance_status": compliance_status.name
+        }
     
-    def get_ttl_compliance_report(self, user_filter: str = None, all_users: bool = False, all_orgs: bool = False) -> Dict:
+    def analyze_workspace_ttl(self, workspace: Dict, seconds_remaining: Optional[int] = None,
+                              now: datetime = None) -> Dict:
         """
-        Generate comprehensive TTL compliance report
+        Analyze TTL compliance for a single workspace
+        
+        Args:
+            workspace: Workspace dictionary
+            seconds_remaining: Precomputed seconds until the deadline (parsed here if omitted)
+            now: Current time shared across a report (defaults to now)
+            
+        Returns:
+            Analysis dictionary with TTL information
+        """
+        compliance_status, ttl = self._classify(workspace, seconds_remaining, now)
+        return self._enrich(workspace, compliance_status, ttl, now)
+    
+    def _scoped_workspaces(self, user_filter: str = None, all_users: bool = False) -> List[Dict]:
+        """
+        Get the workspaces in scope for a TTL check
         
         Args:
             user_filter: Optional username to filter by (overrides all_users)
             all_users: Whether to include all users (default: current user only)
-            all_orgs: Whether to include workspaces from all organizations
             
         Returns:
-            Compliance report dictionary
+            List of workspace dictionaries
         """
         # Get all workspaces
-        all_workspaces = self.controller.get_workspaces()
+        if user_filter or all_users:
+            all_workspaces = self.controller.get_workspaces()
+        else:
+            # The current user lookup is an independent API round-trip, so overlap it
+            # (run in a copy of our context so context-local state such as captured
+            # output follows the work into the pool thread)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                current_user_future = executor.submit(contextvars.copy_context().run,
+                                                      self.controller.get_current_user)
+                all_workspaces = self.controller.get_workspaces()
+                current_user = current_user_future.result()
         
         # Determine user filtering
         if user_filter:
@@ -209,7 +397,6 @@ class TTLMonitorAgent:
                             if ws.get('owner_name') == user_filter]
         elif not all_users:
             # Default: current user only
-            current_user = self.controller.get_current_user()
             if current_user:
                 current_username = current_user.get('username')
                 all_workspaces = [ws for ws in all_workspaces 
@@ -218,34 +405,83 @@ class TTLMonitorAgent:
                 print("Warning: Could not determine current user, showing all workspaces")
         # If all_users is True, we keep all workspaces (no filtering by user)
         
+        return all_workspaces
+    
+    def _batch_seconds_for(self, workspaces: List[Dict], now: datetime) -> List[Optional[int]]:
+        """
+        Seconds remaining until each workspace's deadline
+        
+        Each distinct deadline is parsed once, since workspaces built from the
+        same template often share one.
+        
+        Returns:
+            Seconds remaining per workspace (None where missing or unparseable)
+        """
+        deadlines = [ws.get('latest_build', {}).get('deadline') for ws in workspaces]
+        seconds_by_deadline = {}
+        for deadline in set(deadlines):
+            if not deadline:
+                continue
+            try:
+                seconds_by_deadline[deadline] = int((_parse_iso(deadline) - now).total_seconds())
+            except (ValueError, TypeError):
+                pass  # Left to _format_time_remaining, which reports it as invalid
+        return [seconds_by_deadline.get(deadline) for deadline in deadlines]
+    
+    def get_ttl_compliance_report(self, user_filter: str = None, all_users: bool = False, all_orgs: bool = False,
+                                  include_stopped: bool = True, include_details: bool = False) -> Dict:
+        """
+        Generate comprehensive TTL compliance report
+        
+        Args:
+            user_filter: Optional username to filter by (overrides all_users)
+            all_users: Whether to include all users (default: current user only)
+            all_orgs: Whether to include workspaces from all organizations
+            include_stopped: Whether to list stopped workspaces (they are always counted)
+            include_details: Whether analyses carry IDs, max deadline and timestamps
+            
+        Returns:
+            Compliance report dictionary
+        """
+        all_workspaces = self._scoped_workspaces(user_filter, all_users)
+        
         # Note: all_orgs parameter is for future organization-level filtering
         # Currently, the API returns all accessible workspaces regardless
         
-        # Analyze each workspace
-        analyses = []
-        for workspace in all_workspaces:
-            analysis = self.analyze_workspace_ttl(workspace)
-            analyses.append(analysis)
+        # One clock reading for every deadline and the report timestamp
+        now = datetime.now(timezone.utc)
+        
+        # Compute seconds remaining once per distinct deadline and map back to each workspace
+        batch_seconds = self._batch_seconds_for(all_workspaces, now)
+        
+        # Classify every workspace, but only build analyses for the ones that get listed
+        buckets = [[] for _ in _Status]
+        stopped_count = 0
+        classify = self._classify
+        enrich = self._enrich
+        for i, workspace in enumerate(all_workspaces):
+            compliance_status, ttl = classify(workspace, batch_seconds[i], now)
+            if compliance_status is _Status.STOPPED:
+                stopped_count += 1
+                if not include_stopped:
+                    continue
+            buckets[compliance_status].append(enrich(workspace, compliance_status, ttl, now, include_details))
         
-        # Categorize workspaces
-        expired = [a for a in analyses if a["compliance_status"] == "EXPIRED"]
-        expiring_soon = [a for a in analyses if a["compliance_status"] == "EXPIRING_SOON"]
-        running = [a for a in analyses if a["compliance_status"] == "RUNNING"]
-        stopped = [a for a in analyses if a["compliance_status"] == "STOPPED"]
+        expired, expiring_soon, running, stopped = buckets
         
         # Sort by time remaining (expired first, then by urgency)
-        expired.sort(key=lambda x: x["seconds_remaining"])  # Most overdue first
-        expiring_soon.sort(key=lambda x: x["seconds_remaining"])  # Soonest first
+        expired.sort(key=_BY_SECONDS_REMAINING)  # Most overdue first
+        expiring_soon.sort(key=_BY_SECONDS_REMAINING)  # Soonest first
         
         report = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "total_workspaces": len(analyses),
+            "timestamp": now.isoformat(),
+            "total_workspaces": len(all_workspaces),
             "user_filter": user_filter,
             "summary": {
                 "expired": len(expired),
                 "expiring_soon": len(expiring_soon),
                 "running": len(running),
-                "stopped": len(stopped)
+                "stopped": stopped_count
             },
             "workspaces": {
                 "expired": expired,
@@ -257,6 +493,25 @@ class TTLMonitorAgent:
         
         return report
     
+    def _render_table(self, headers: List[str], rows: List[List]) -> str:
+        """
+        Render rows as a plain-text table with columns padded to a common width
+        
+        Args:
+            headers: Column headers
+            rows: Table rows (cells are rendered with str())
+            
+        Returns:
+            Table text with a header separator line
+        """
+        cells = [[str(value) for value in row] for row in rows]
+        widths = [max([len(header)] + [len(row[i]) for row in cells]) for i, header in enumerate(headers)]
+        row_format = " | ".join(f"{{:<{width}}}" for width in widths)
+        
+        lines = [row_format.format(*headers), "-+-".join("-" * width for width in widths)]
+        lines.extend(row_format.format(*row) for row in cells)
+        return "\n".join(line.rstrip() for line in lines)
+    
     def print_compliance_report(self, user_filter: str = None, 
                               show_all: bool = False, all_users: bool = False, all_orgs: bool = False):
         """
@@ -268,12 +523,12 @@ class TTLMonitorAgent:
             all_users: Whether to include all users (default: current user only)
             all_orgs: Whether to include workspaces from all organizations
         """
-        report = self.get_ttl_compliance_report(user_filter, all_users, all_orgs)
+        # Stopped rows (shown with show_all) need updated_at
+        report = self.get_ttl_compliance_report(user_filter, all_users, all_orgs,
+                                                include_stopped=show_all, include_details=show_all)
         
-        print("=" * 80)
-        print("TTL COMPLIANCE REPORT")
-        print("=" * 80)
-        print(f"Generated: {self._format_date(report['timestamp'])}")
+        lines = ["=" * 80, "TTL COMPLIANCE REPORT", "=" * 80]
+        lines.append(f"Generated: {self._format_date(report['timestamp'])}")
         
         # Show scope information
         scope_info = []
@@ -290,24 +545,24 @@ class TTLMonitorAgent:
             scope_info.append("Organizations: All")
         
         if scope_info:
-            print(f"Scope: {', '.join(scope_info)}")
+            lines.append(f"Scope: {', '.join(scope_info)}")
         
-        print(f"Total Workspaces: {report['total_workspaces']}")
-        print()
+        lines.append(f"Total Workspaces: {report['total_workspaces']}")
+        lines.append("")
         
         # Summary
         summary = report['summary']
-        print("SUMMARY:")
-        print(f"  Expired: {summary['expired']}")
-        print(f"  Expiring Soon: {summary['expiring_soon']}")
-        print(f"  Running: {summary['running']}")
-        print(f"  Stopped: {summary['stopped']}")
-        print()
+        lines.append("SUMMARY:")
+        lines.append(f"  Expired: {summary['expired']}")
+        lines.append(f"  Expiring Soon: {summary['expiring_soon']}")
+        lines.append(f"  Running: {summary['running']}")
+        lines.append(f"  Stopped: {summary['stopped']}")
+        lines.append("")
         
         # Expired workspaces
         if report['workspaces']['expired']:
-            print("🔴 RUNNING WORKSPACES THAT SHOULD BE STOPPED (TTL EXPIRED):")
-            print("-" * 80)
+            lines.append("🔴 RUNNING WORKSPACES THAT SHOULD BE STOPPED (TTL EXPIRED):")
+            lines.append("-" * 80)
             
             table_data = []
             for ws in report['workspaces']['expired']:
@@ -320,13 +575,13 @@ class TTLMonitorAgent:
                 ])
             
             headers = ["Owner", "Workspace", "TTL", "Status", "Deadline"]
-            print(tabulate(table_data, headers=headers, tablefmt="grid"))
-            print()
+            lines.append(self._render_table(headers, table_data))
+            lines.append("")
         
         # Expiring soon
         if report['workspaces']['expiring_soon']:
-            print("🟡 RUNNING WORKSPACES EXPIRING SOON:")
-            print("-" * 80)
+            lines.append("🟡 RUNNING WORKSPACES EXPIRING SOON:")
+            lines.append("-" * 80)
             
             table_data = []
             for ws in report['workspaces']['expiring_soon']:
@@ -339,13 +594,13 @@ class TTLMonitorAgent:
                 ])
             
             headers = ["Owner", "Workspace", "TTL", "Time Remaining", "Deadline"]
-            print(tabulate(table_data, headers=headers, tablefmt="grid"))
-            print()
+            lines.append(self._render_table(headers, table_data))
+            lines.append("")
         
         # Running workspaces (if requested)
         if show_all and report['workspaces']['running']:
-            print("🟢 RUNNING WORKSPACES:")
-            print("-" * 80)
+            lines.append("🟢 RUNNING WORKSPACES:")
+            lines.append("-" * 80)
             
             table_data = []
             for ws in report['workspaces']['running']:
@@ -358,13 +613,13 @@ class TTLMonitorAgent:
                 ])
             
             headers = ["Owner", "Workspace", "TTL", "Time Remaining", "Status"]
-            print(tabulate(table_data, headers=headers, tablefmt="simple"))
-            print()
+            lines.append(self._render_table(headers, table_data))
+            lines.append("")
         
         # Stopped workspaces (if requested)
         if show_all and report['workspaces']['stopped']:
-            print("⚫ STOPPED WORKSPACES:")
-            print("-" * 80)
+            lines.append("⚫ STOPPED WORKSPACES:")
+            lines.append("-" * 80)
             
             # Show first 20 stopped workspaces to avoid overwhelming output
             stopped_to_show = report['workspaces']['stopped'][:20]
@@ -379,25 +634,28 @@ class TTLMonitorAgent:
                 ])
             
             headers = ["Owner", "Workspace", "TTL", "Status", "Last Updated"]
-            print(tabulate(table_data, headers=headers, tablefmt="simple"))
+            lines.append(self._render_table(headers, table_data))
             
             if len(report['workspaces']['stopped']) > 20:
-                print(f"... and {len(report['workspaces']['stopped']) - 20} more stopped workspaces")
-            print()
+                lines.append(f"... and {len(report['workspaces']['stopped']) - 20} more stopped workspaces")
+            lines.append("")
         
         # Recommendations
-        print("RECOMMENDATIONS:")
+        lines.append("RECOMMENDATIONS:")
         if summary['expired'] > 0:
-            print(f"  • {summary['expired']} RUNNING workspace(s) have exceeded their TTL and should be stopped")
+            lines.append(f"  • {summary['expired']} RUNNING workspace(s) have exceeded their TTL and should be stopped")
         if summary['expiring_soon'] > 0:
             threshold = self.config["ttl_monitor"]["warning_threshold_hours"]
-            print(f"  • {summary['expiring_soon']} RUNNING workspace(s) will expire within {threshold} hour(s)")
+            lines.append(f"  • {summary['expiring_soon']} RUNNING workspace(s) will expire within {threshold} hour(s)")
         if summary['expired'] == 0 and summary['expiring_soon'] == 0:
-            print("  • All running workspaces are within TTL compliance")
+            lines.append("  • All running workspaces are within TTL compliance")
         if summary['stopped'] > 0:
-            print(f"  • {summary['stopped']} workspace(s) are already stopped")
+            lines.append(f"  • {summary['stopped']} workspace(s) are already stopped")
         
-        print("=" * 80)
+        lines.append("=" * 80)
+        
+        # Emit the whole report with a single write
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def get_workspaces_exceeding_ttl(self, threshold_hours: float = None) -> List[Dict]:
         """
@@ -410,37 +668,61 @@ class TTLMonitorAgent:
             List of workspace analyses for workspaces exceeding TTL
         """
         if threshold_hours is None:
-            threshold_hours = self.config["ttl_monitor"]["warning_threshold_hours"]
-        
-        report = self.get_ttl_compliance_report()
+            threshold_seconds = self._warning_threshold_seconds
+        else:
+            threshold_seconds = threshold_hours * 3600
         
-        # Return expired workspaces and those expiring within threshold
-        exceeding = report['workspaces']['expired'].copy()
+        return self._collect_exceeding(threshold_seconds)
+    
+    def _collect_exceeding(self, threshold_seconds: float) -> List[Dict]:
+        """
+        Analyze only the expired and expiring-soon workspaces of the current user
         
-        threshold_seconds = threshold_hours * 3600
-        for ws in report['workspaces']['expiring_soon']:
-            if ws['seconds_remaining'] <= threshold_seconds:
-                exceeding.append(ws)
+        Unlike get_ttl_compliance_report(), nothing is built for running
+        or stopped workspaces.
         
-        return exceeding
+        Args:
+            threshold_seconds: Only include expiring workspaces within this many seconds
+            
+        Returns:
+            Expired analyses (most overdue first), then expiring ones (soonest first),
+            without the IDs and timestamps only JSON reports carry
+        """
+        workspaces = self._scoped_workspaces()
+        now = datetime.now(timezone.utc)
+        batch_seconds = self._batch_seconds_for(workspaces, now)
+        
+        expired = []
+        expiring_soon = []
+        for i, workspace in enumerate(workspaces):
+            compliance_status, ttl = self._classify(workspace, batch_seconds[i], now)
+            if compliance_status is _Status.EXPIRED:
+                expired.append(self._enrich(workspace, compliance_status, ttl, now, False))
+            elif compliance_status is _Status.EXPIRING_SOON and ttl[1] <= threshold_seconds:
+                expiring_soon.append(self._enrich(workspace, compliance_status, ttl, now, False))
+        
+        expired.sort(key=_BY_SECONDS_REMAINING)
+        expiring_soon.sort(key=_BY_SECONDS_REMAINING)
+        expired.extend(expiring_soon)  # In place: no third list
+        return expired
     
     def monitor_continuous(self, interval_minutes: int = None):
         """
         Run continuous monitoring (for daemon mode)
         
         Args:
-            interval_minutes: Check interval in minutes
+            interval_minutes: Check interval in minutes (defaults to config, re-read on change)
         """
         import time
         
-        if interval_minutes is None:
-            interval_minutes = self.config["ttl_monitor"]["check_interval_minutes"]
-        
-        print(f"Starting TTL monitoring (checking every {interval_minutes} minutes)")
+        print(f"Starting TTL monitoring (checking every {interval_minutes or self._check_interval_minutes} minutes)")
         print("Press Ctrl+C to stop")
         
         try:
             while True:
+                # One stat() per cycle; the file is only re-parsed after it changes
+                self._maybe_reload_config()
+                
                 print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Running TTL check...")
                 
                 exceeding = self.get_workspaces_exceeding_ttl()
@@ -451,13 +733,15 @@ class TTLMonitorAgent:
                 else:
                     print("All workspaces within TTL compliance")
                 
-                time.sleep(interval_minutes * 60)
+                time.sleep((interval_minutes or self._check_interval_minutes) * 60)
                 
         except KeyboardInterrupt:
             print("\nMonitoring stopped by user")
 
 def main():
     """Main function with command line interface"""
+    import argparse
+    
     parser = argparse.ArgumentParser(description="Coder TTL Monitor Agent")
     parser.add_argument("--config", default="agents_config.json",
                        help="Configuration file path")
@@ -501,8 +785,9 @@ def main():
         if args.monitor:
             agent.monitor_continuous(args.interval)
         elif args.json:
-            report = agent.get_ttl_compliance_report(args.user, all_users, all_orgs)
-            print(json.dumps(report, indent=2))
+            report = agent.get_ttl_compliance_report(args.user, all_users, all_orgs,
+                                                     include_stopped=True, include_details=True)
+            dump_json(report)
         else:
             # Default: print compliance report
             agent.print_compliance_report(args.user, args.show_all, all_users, all_orgs)
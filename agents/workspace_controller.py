@@ -5,23 +5,269 @@ Extends the coder-audit-simple project with workspace stopping capabilities
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import asyncio
+import hashlib
+import io
 import json
 import os
+import random
 import sys
+import threading
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, TextIO
+from urllib.parse import urlencode
+
+try:
+    import orjson
+except ImportError:  # Optional accelerator, fall back to stdlib json
+    orjson = None
+
+try:
+    import httpx
+except ImportError:  # Optional HTTP/2 transport, fall back to requests
+    httpx = None
+
+try:
+    import msgpack
+except ImportError:  # Optional compact on-disk cache format, fall back to JSON
+    msgpack = None
+
+# Seconds a cached GET response stays valid, per endpoint (query string ignored)
+CACHE_TTLS = {
+    '/api/v2/templates': 300,
+    '/api/v2/organizations': 300,
+    '/api/v2/deployment/config': 60,
+    '/api/v2/users/me': 60,
+    '/api/v2/buildinfo': 300,
+}
+DEFAULT_CACHE_TTL = 30
+
+# Seconds an expired response may still be served when refreshing it fails.
+# Only slow-changing read endpoints opt in; workspace state never goes stale.
+STALE_IF_ERROR = {
+    '/api/v2/templates': 24 * 3600,
+    '/api/v2/organizations': 24 * 3600,
+    '/api/v2/deployment/config': 24 * 3600,
+}
+
+# Individual template lookups before get_template_name() loads the full list instead
+TEMPLATE_LOOKUPS_BEFORE_BULK = 10
+
+# Deployment config workspace TTL settings (label, key), all in milliseconds
+WORKSPACE_TTL_SETTINGS = (
+    ('Max Ttl', 'max_ttl_ms'),
+    ('Default Ttl', 'default_ttl_ms'),
+    ('Activity Bump', 'activity_bump_ms'),
+    ('Failure Ttl', 'failure_ttl_ms'),
+)
+
+# Retry policy shared by the session adapter (_CoderRetry) and the async controller
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'PUT', 'DELETE'})
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30
+MAX_RETRIES = 3
+
+# (connect, read) timeout so an unreachable host fails fast
+REQUEST_TIMEOUT = (5, 30)
+
+# On-disk cache shared between agent runs
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "coder-audit"
+)
+
+
+def is_retryable(method: str, status: int = None) -> bool:
+    """
+    Decide whether a failed request may be retried
+
+    A 429 or 503 means the server turned the request away before handling
+    it, so any method may be retried. Other failures (5xx responses,
+    connection errors, timeouts) are only retried for idempotent methods,
+    since a POST may already have taken effect.
+
+    Args:
+        method: Upper-case HTTP method
+        status: Response status code, or None for connection errors/timeouts
+
+    Returns:
+        True if the request should be retried
+    """
+    if status in (429, 503):
+        return True
+    if method not in IDEMPOTENT_METHODS:
+        return False
+    return status is None or status in RETRYABLE_STATUSES
+
+
+def backoff_delay(attempt: int, retry_after: str = None) -> float:
+    """
+    Get the delay before a retry: capped exponential backoff with full jitter
+
+    Args:
+        attempt: Number of the failed attempt (0 for the first request)
+        retry_after: Retry-After header value, honored when it gives seconds
+
+    Returns:
+        Seconds to sleep before the next attempt
+    """
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass  # HTTP-date form; fall back to jitter
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class _CoderRetry(Retry):
+    """urllib3 Retry that follows is_retryable() and backoff_delay(), like the async controller"""
+    
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        return is_retryable(method.upper(), status_code)
+    
+    def get_backoff_time(self) -> float:
+        # Retry-After is applied by urllib3 itself (respect_retry_after_header)
+        return backoff_delay(len(self.history) - 1) if self.history else 0
+
+
+def load_json(raw: bytes) -> Any:
+    """
+    Parse a JSON response body
+
+    Uses orjson's parser when it is installed, otherwise stdlib json.
+
+    Args:
+        raw: Raw response body
+
+    Returns:
+        Parsed JSON data
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def encode_json(data: Any) -> bytes:
+    """
+    Encode a request body as JSON bytes
+
+    Uses orjson's encoder when it is installed, otherwise stdlib json.
+
+    Args:
+        data: JSON-serializable data
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode()
+
+
+def dump_json(data: Any, stream: TextIO = None) -> None:
+    """
+    Print data as indented JSON
+
+    Uses orjson when it is installed (writing bytes straight to the
+    stream's buffer), otherwise streams the stdlib encoder's chunks to
+    the stream instead of building the whole string in memory.
+
+    Args:
+        data: JSON-serializable data (non-JSON values are rendered with str())
+        stream: Text stream to write to (defaults to stdout)
+    """
+    if stream is None:
+        stream = sys.stdout
+    
+    if orjson is not None:
+        raw = orjson.dumps(
+            data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ) + b"\n"
+        buffer = getattr(stream, 'buffer', None)
+        if buffer is None:
+            stream.write(raw.decode())
+            return
+        stream.flush()
+        buffer.write(raw)
+        buffer.flush()
+    else:
+        json.dump(data, stream, indent=2, default=str)
+        stream.write("\n")
+
+
+# Template names shared by all controllers for one deployment and token:
+# controller fingerprint -> (expires_at, {template_id: name}). Keyed by the
+# fingerprint so the token itself is never a key; guarded by the lock.
+_template_names: Dict[str, tuple] = {}
+_template_names_lock = threading.Lock()
+
+
+def is_stop_reason_error(error: Exception) -> bool:
+    """Whether a failed stop build was rejected over its reason field"""
+    return "reason" in str(error).lower()
+
+class RateLimiter:
+    """Token bucket shared by worker threads or tasks to cap the overall request rate"""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize rate limiter
+        
+        Args:
+            rate: Tokens added per second
+            burst: Maximum tokens that can accumulate
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _take(self) -> float:
+        """Take a token if one is available; otherwise return the seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+    
+    def acquire(self) -> None:
+        """Block until a token is available, then take it"""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            time.sleep(wait)
+    
+    async def acquire_async(self) -> None:
+        """Wait without blocking the event loop until a token is available, then take it"""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
 
 class WorkspaceController:
     """Core controller for Coder workspace operations"""
     
-    def __init__(self, coder_url: str = None, token: str = None):
+    def __init__(self, coder_url: str = None, token: str = None, http2: bool = None):
         """
         Initialize workspace controller
         
         Args:
             coder_url: Coder instance URL (defaults to CODER_URL env var)
             token: API token (defaults to CODER_TOKEN env var or audit-token.txt)
+            http2: Multiplex requests over HTTP/2 via httpx when it is installed
+                   (defaults to the CODER_HTTP2 env var)
         """
         self.coder_url = coder_url or self._get_coder_url()
         self.token = token or self._get_token()
@@ -30,6 +276,151 @@ class WorkspaceController:
             'Coder-Session-Token': self.token,
             'Content-Type': 'application/json'
         }
+        
+        # Pooled session so repeated API calls reuse keep-alive connections
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        # Retries run inside urllib3 on the pooled connection. Status retries follow
+        # is_retryable(); read errors are only retried for idempotent methods
+        retry = _CoderRetry(total=MAX_RETRIES, backoff_factor=BACKOFF_BASE,
+                            status_forcelist=RETRYABLE_STATUSES, allowed_methods=IDEMPOTENT_METHODS,
+                            respect_retry_after_header=True, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=100, max_retries=retry)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+        
+        if http2 is None:
+            http2 = os.environ.get('CODER_HTTP2', '').lower() in ('1', 'true', 'yes')
+        self._client = self._make_http2_client() if http2 else None
+        
+        # Short-lived cache of GET responses: endpoint -> (expires_at, response, fetched_at)
+        self._cache: Dict[str, tuple] = {}
+        
+        # GETs currently on the wire, so concurrent callers share one request
+        self._inflight: Dict[str, threading.Event] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Workspace summaries keyed by (workspace_id, status)
+        self._summary_cache: Dict[tuple, str] = {}
+        
+        # How many template names needed their own request (see get_template_name)
+        self._template_lookups = 0
+        
+        # (expires_at, {username: user}) index built by get_users_by_username()
+        self._users_by_username: Optional[tuple] = None
+        
+        # (expires_at, {user_id: [group]}) index built by get_user_group_index()
+        self._user_group_index: Optional[tuple] = None
+        
+        # Stop-build body the server accepted, so later stops skip the reason probe
+        self._stop_body: Optional[Dict] = None
+        self._stop_body_lock = threading.Lock()
+        
+        # Monotonic time of the last successful validate_connection()
+        self._validated_at: Optional[float] = None
+        
+        # On-disk cache entries are namespaced per deployment and token
+        self.disk_cache_enabled = True
+        self._cache_fp = hashlib.blake2b(
+            f"{self.coder_url}\0{self.token}".encode(), digest_size=8
+        ).hexdigest()
+    
+    def _make_http2_client(self) -> Optional["httpx.Client"]:
+        """
+        Create an HTTP/2 client that multiplexes concurrent requests over one connection
+        
+        Returns:
+            httpx client, or None if httpx or its h2 extra is not installed
+        """
+        if httpx is None:
+            return None
+        try:
+            # httpx retries connection failures only; _http2_request retries status codes
+            transport = httpx.HTTPTransport(
+                http2=True, retries=MAX_RETRIES,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+            )
+            return httpx.Client(base_url=self.coder_url, headers=self.headers,
+                                timeout=httpx.Timeout(REQUEST_TIMEOUT[1], connect=REQUEST_TIMEOUT[0]),
+                                transport=transport)
+        except ImportError:  # httpx without the h2 package
+            return None
+    
+    def close(self) -> None:
+        """Close the pooled HTTP session and its keep-alive connections"""
+        self._session.close()
+        if self._client is not None:
+            self._client.close()
+    
+    def __enter__(self) -> "WorkspaceController":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def _cache_path(self, name: str) -> str:
+        """Path of a named on-disk cache entry for this deployment"""
+        extension = "msgpack" if msgpack is not None else "json"
+        return os.path.join(CACHE_DIR, f"{self._cache_fp}-{name}.{extension}")
+    
+    def _cache_load(self, name: str, max_age: float) -> Any:
+        """
+        Load a value saved by _cache_store
+        
+        Args:
+            name: Cache entry name
+            max_age: Maximum age of the entry in seconds
+            
+        Returns:
+            Cached value, or None if missing, stale, unreadable or disabled
+        """
+        if not self.disk_cache_enabled:
+            return None
+        
+        path = self._cache_path(name)
+        try:
+            if time.time() - os.path.getmtime(path) > max_age:
+                return None
+            with open(path, 'rb') as f:
+                raw = f.read()
+            return msgpack.unpackb(raw, raw=False) if msgpack is not None else json.loads(raw)
+        except Exception:
+            return None
+    
+    def _cache_store(self, name: str, value: Any) -> None:
+        """
+        Save a value to the on-disk cache (silently skipped if the cache dir is unwritable)
+        
+        Args:
+            name: Cache entry name
+            value: msgpack/JSON-serializable value
+        """
+        if not self.disk_cache_enabled:
+            return
+        
+        path = self._cache_path(name)
+        try:
+            os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+            if msgpack is not None:
+                raw = msgpack.packb(value, use_bin_type=True)
+            else:
+                raw = json.dumps(value).encode()
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(raw)
+            os.replace(tmp_path, path)
+        except Exception:
+            pass
+    
+    def clear_caches(self) -> None:
+        """Drop this controller's cached API data and the template names it shares with same-deployment controllers"""
+        self.invalidate_cache()
+        self._summary_cache.clear()
+        self._users_by_username = None
+        self._user_group_index = None
+        with _template_names_lock:
+            _template_names.pop(self._cache_fp, None)
+        self._template_lookups = 0
     
     def _get_token(self) -> str:
         """Get API token from file or environment variable"""
@@ -55,15 +446,16 @@ class WorkspaceController:
         
         return url.rstrip('/')
     
-    def _make_request(self, method: str, endpoint: str, data: Dict = None, retries: int = 3) -> Dict:
+    def _make_request(self, method: str, endpoint: str, data: Dict = None,
+                      params: Dict = None) -> Dict:
         """
-        Make API request with error handling and retries
+        Make API request with error handling (retries are handled by the session adapter)
         
         Args:
             method: HTTP method (GET, POST, PUT, DELETE)
             endpoint: API endpoint (without base URL)
             data: Request payload for POST/PUT requests
-            retries: Number of retry attempts
+            params: Optional query parameters appended to the URL
             
         Returns:
             Response JSON data
@@ -72,77 +464,209 @@ class WorkspaceController:
             Exception: If request fails after all retries
         """
         url = f"{self.coder_url}{endpoint}"
+        method = method.upper()
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            raise ValueError(f"Unsupported HTTP method: {method}")
         
-        for attempt in range(retries + 1):
+        # Only POST/PUT carry a body, pre-encoded as JSON bytes; the session
+        # already sends the auth and Content-Type headers
+        body = encode_json(data) if data and method in ('POST', 'PUT') else None
+        
+        if self._client is not None:
+            response = self._http2_request(method, endpoint, body, params)
+        else:
             try:
-                if method.upper() == 'GET':
-                    response = requests.get(url, headers=self.headers, timeout=30)
-                elif method.upper() == 'POST':
-                    response = requests.post(url, headers=self.headers, 
-                                           data=json.dumps(data) if data else None, timeout=30)
-                elif method.upper() == 'PUT':
-                    response = requests.put(url, headers=self.headers, 
-                                          data=json.dumps(data) if data else None, timeout=30)
-                elif method.upper() == 'DELETE':
-                    response = requests.delete(url, headers=self.headers, timeout=30)
-                else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
-                
-                if response.status_code in [200, 201, 204]:
-                    return response.json() if response.content else {}
-                elif response.status_code == 404:
-                    raise Exception(f"Resource not found: {endpoint}")
-                elif response.status_code == 403:
-                    raise Exception(f"Permission denied: {endpoint}")
-                else:
-                    raise Exception(f"API error {response.status_code}: {response.text}")
-                    
+                response = self._session.request(method, url, data=body, params=params,
+                                                 timeout=REQUEST_TIMEOUT)
             except requests.exceptions.RequestException as e:
-                if attempt < retries:
-                    wait_time = 2 ** attempt  # Exponential backoff
-                    print(f"Request failed (attempt {attempt + 1}/{retries + 1}), retrying in {wait_time}s: {e}")
-                    time.sleep(wait_time)
-                else:
-                    raise Exception(f"Request failed after {retries + 1} attempts: {e}")
+                raise Exception(f"Request failed: {e}")
+        
+        if response.status_code in [200, 201, 204]:
+            return load_json(response.content) if response.content else {}
+        elif response.status_code == 404:
+            raise Exception(f"Resource not found: {endpoint}")
+        elif response.status_code == 403:
+            raise Exception(f"Permission denied: {endpoint}")
+        else:
+            raise Exception(f"API error {response.status_code}: {response.text}")
     
-    def get_workspaces(self, filters: Dict = None) -> List[Dict]:
+    def _http2_request(self, method: str, endpoint: str, body: Optional[bytes],
+                       params: Dict = None) -> "httpx.Response":
+        """
+        Send a request over the HTTP/2 client, retrying like the requests session
+        
+        httpx has no status-based retries, so this applies the same
+        is_retryable()/backoff_delay() policy as the urllib3 adapter.
+        
+        Args:
+            method: HTTP method (already upper-cased)
+            endpoint: API endpoint (without base URL)
+            body: Pre-encoded JSON body, or None
+            params: Optional query parameters appended to the URL
+            
+        Returns:
+            Final response (successful or not retryable)
+            
+        Raises:
+            Exception: If the request fails after all retries
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                response = self._client.request(method, endpoint, content=body, params=params)
+            except httpx.HTTPError as e:
+                # Connect failures never reached the server, so any method may retry
+                connect_error = isinstance(e, httpx.ConnectError)
+                if attempt < MAX_RETRIES and (connect_error or is_retryable(method)):
+                    delay = backoff_delay(attempt)
+                    print(f"Request failed (attempt {attempt + 1}/{MAX_RETRIES + 1}), retrying in {delay:.1f}s: {e}")
+                    time.sleep(delay)
+                    continue
+                raise Exception(f"Request failed after {attempt + 1} attempts: {e}")
+            
+            if attempt < MAX_RETRIES and is_retryable(method, response.status_code):
+                delay = backoff_delay(attempt, response.headers.get('Retry-After'))
+                print(f"API error {response.status_code} (attempt {attempt + 1}/{MAX_RETRIES + 1}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            return response
+    
+    def _cached_get(self, endpoint: str, ttl: float = None) -> Dict:
+        """
+        GET an endpoint, reusing the response for ttl seconds
+        
+        Concurrent callers asking for the same endpoint wait for the request
+        already in flight instead of sending their own. Endpoints listed in
+        STALE_IF_ERROR fall back to their last response if the refresh fails.
+        
+        Args:
+            endpoint: API endpoint (without base URL)
+            ttl: Seconds the cached response stays valid (defaults to CACHE_TTLS)
+            
+        Returns:
+            Response JSON data
+        """
+        cached = self._cache.get(endpoint)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
+        with self._inflight_lock:
+            in_flight = self._inflight.get(endpoint)
+            if in_flight is None:
+                done = self._inflight[endpoint] = threading.Event()
+        
+        base = endpoint.split('?', 1)[0]
+        if in_flight is not None:
+            in_flight.wait()
+            cached = self._cache.get(endpoint)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+            # The shared request failed; try (and report errors) ourselves
+            return self._get_or_stale(endpoint, base, cached)
+        
+        try:
+            if ttl is None:
+                ttl = CACHE_TTLS.get(base, DEFAULT_CACHE_TTL)
+            response = self._get_or_stale(endpoint, base, cached)
+            if cached is None or response is not cached[1]:
+                now = time.monotonic()
+                self._cache[endpoint] = (now + ttl, response, now)
+            return response
+        finally:
+            with self._inflight_lock:
+                del self._inflight[endpoint]
+            done.set()
+    
+    def _get_or_stale(self, endpoint: str, base: str, cached: Optional[tuple]) -> Dict:
+        """
+        GET an endpoint, serving the expired cache entry instead if the request fails
+        
+        Args:
+            endpoint: API endpoint (without base URL)
+            base: Endpoint without its query string, used to look up STALE_IF_ERROR
+            cached: Current (possibly expired) cache entry, or None
+            
+        Returns:
+            Response JSON data
+        """
+        try:
+            return self._make_request('GET', endpoint)
+        except Exception as e:
+            stale_for = STALE_IF_ERROR.get(base)
+            if cached is None or not stale_for or time.monotonic() - cached[2] > stale_for:
+                raise
+            print(f"Warning: serving cached {endpoint} after refresh failed: {e}")
+            return cached[1]
+    
+    def invalidate_cache(self, endpoint: str = None) -> None:
+        """
+        Drop cached GET responses
+        
+        Args:
+            endpoint: Endpoint to invalidate, including any query-string variants
+                      (defaults to all cached endpoints)
+        """
+        if endpoint is None:
+            self._cache.clear()
+        else:
+            for key in [k for k in list(self._cache) if k == endpoint or k.startswith(endpoint + '?')]:
+                self._cache.pop(key, None)
+    
+    def get_workspaces(self, filters: Dict = None, owner: str = None,
+                       template: str = None, status: str = None) -> List[Dict]:
         """
         Get all workspaces with optional filtering
         
         Args:
-            filters: Optional filters (status, owner, template)
+            filters: Optional filters (status, owner, template ID); status and owner
+                     are also sent to the server, the template ID is matched locally
+            owner: Only return workspaces owned by this username
+            template: Only return workspaces using this template name (server-side only)
+            status: Only return workspaces in this status
             
         Returns:
             List of workspace dictionaries
         """
         try:
-            response = self._make_request('GET', '/api/v2/workspaces')
+            if filters:
+                owner = owner or filters.get('owner')
+                status = status or filters.get('status')
+            
+            # Push owner/template/status to Coder's workspace search query
+            terms = [f"{key}:{value}" for key, value in
+                     (('owner', owner), ('template', template), ('status', status)) if value]
+            endpoint = '/api/v2/workspaces'
+            if terms:
+                try:
+                    response = self._cached_get(endpoint + '?' + urlencode({'q': ' '.join(terms)}))
+                except Exception as e:
+                    if template:
+                        raise
+                    # Older Coder releases reject the search query; filter locally instead
+                    print(f"Workspace search query rejected, filtering client-side: {e}")
+                    response = self._cached_get(endpoint)
+            else:
+                response = self._cached_get(endpoint)
             workspaces = response.get('workspaces', [])
             
+            # Build one predicate per filter in use, outside the per-workspace loop
+            # (owner/status are re-checked so a rejected search query still filters correctly)
+            predicates = []
+            if status:
+                predicates.append(lambda ws, want=status:
+                                  (ws.get('latest_build') or {}).get('status') == want)
+            if owner:
+                predicates.append(lambda ws, want=owner: ws.get('owner_name') == want)
             if filters:
-                filtered_workspaces = []
-                for ws in workspaces:
-                    include = True
-                    
-                    if 'status' in filters:
-                        ws_status = ws.get('latest_build', {}).get('status')
-                        if ws_status != filters['status']:
-                            include = False
-                    
-                    if 'owner' in filters and include:
-                        if ws.get('owner_name') != filters['owner']:
-                            include = False
-                    
-                    if 'template' in filters and include:
-                        if ws.get('template_id') != filters['template']:
-                            include = False
-                    
-                    if include:
-                        filtered_workspaces.append(ws)
-                
-                return filtered_workspaces
+                if 'template' in filters:
+                    predicates.append(lambda ws, want=filters['template']: ws.get('template_id') == want)
             
-            return workspaces
+            if len(predicates) == 1:
+                return list(filter(predicates[0], workspaces))
+            if predicates:
+                return [ws for ws in workspaces if all(pred(ws) for pred in predicates)]
+            
+            # Copy so callers can't mutate the cached response
+            return list(workspaces)
             
         except Exception as e:
             print(f"Error fetching workspaces: {e}")
@@ -163,17 +687,89 @@ class WorkspaceController:
         workspaces = self.get_workspaces({'status': 'running'})
         
         if exclude_users or exclude_templates:
-            filtered = []
-            for ws in workspaces:
-                if exclude_users and ws.get('owner_name') in exclude_users:
-                    continue
-                if exclude_templates and ws.get('template_id') in exclude_templates:
-                    continue
-                filtered.append(ws)
-            return filtered
+            # Hash lookups instead of scanning the exclusion lists per workspace
+            exclude_users = frozenset(exclude_users or ())
+            exclude_templates = frozenset(exclude_templates or ())
+            return [ws for ws in workspaces
+                    if ws.get('owner_name') not in exclude_users
+                    and ws.get('template_id') not in exclude_templates]
         
         return workspaces
     
+    def _server_version(self) -> Optional[str]:
+        """Coder server version from /api/v2/buildinfo, or None if unavailable"""
+        try:
+            return self._cached_get('/api/v2/buildinfo').get('version')
+        except Exception:
+            return None
+    
+    @property
+    def stop_body(self) -> Optional[Dict]:
+        """Stop-build body learned so far in this process, or None"""
+        return self._stop_body
+    
+    def load_stop_body(self) -> Optional[Dict]:
+        """
+        Get the stop-build body learned earlier in this process or a previous run
+        
+        Returns:
+            Request body to send, or None if it still has to be discovered
+        """
+        if self._stop_body is not None:
+            return self._stop_body
+        
+        saved = self._cache_load('stop_body', max_age=7 * 24 * 3600)
+        if saved and saved.get('version') and saved.get('version') == self._server_version():
+            self._stop_body = saved.get('body')
+        return self._stop_body
+    
+    def _discover_stop_body(self, endpoint: str) -> Dict:
+        """
+        Stop a workspace by probing which build body the server accepts, and remember it
+        
+        Note: The reason field seems to have validation constraints in the API,
+        so try without one first and then with each standard reason.
+        
+        Args:
+            endpoint: Builds endpoint of the workspace to stop
+            
+        Returns:
+            The request body that succeeded
+            
+        Raises:
+            Exception: The original API error if no body is accepted
+        """
+        body = {"transition": "stop"}
+        try:
+            self._make_request('POST', endpoint, body)
+        except Exception as api_error:
+            if not is_stop_reason_error(api_error):
+                raise
+            
+            for valid_reason in ["initiator", "autostart", "autostop", "shutdown"]:
+                body = {"transition": "stop", "reason": valid_reason}
+                try:
+                    self._make_request('POST', endpoint, body)
+                    break
+                except Exception:
+                    continue
+            else:
+                raise api_error
+        
+        self._remember_stop_body(body)
+        return body
+    
+    def _remember_stop_body(self, body: Dict) -> None:
+        """
+        Record the stop-build body the server accepted, in memory and in the on-disk cache
+        
+        Args:
+            body: Request body that succeeded
+        """
+        self._stop_body = body
+        if self.disk_cache_enabled:
+            self._cache_store('stop_body', {'version': self._server_version(), 'body': body})
+    
     def stop_workspace(self, workspace_id: str, reason: str = "Automated stop") -> bool:
         """
         Stop a specific workspace
@@ -185,75 +781,92 @@ class WorkspaceController:
         Returns:
             True if successful, False otherwise
         """
+        endpoint = f"/api/v2/workspaces/{workspace_id}/builds"
+        
         try:
-            # Create a stop build for the workspace
-            # Note: The reason field seems to have validation constraints in the API
-            # so we'll try different approaches
-            
-            # First try with just the transition
-            build_data = {
-                "transition": "stop"
-            }
-            
-            endpoint = f"/api/v2/workspaces/{workspace_id}/builds"
+            body = self.load_stop_body()
+            if body is None:
+                # First stop: probe once while concurrent stops wait for the result
+                with self._stop_body_lock:
+                    body = self._stop_body
+                    if body is None:
+                        body = self._discover_stop_body(endpoint)
+                        self.report_stopped(workspace_id, reason, body)
+                        return True
             
             try:
-                response = self._make_request('POST', endpoint, build_data)
-                print(f"Successfully initiated stop for workspace {workspace_id}: {reason}")
-                return True
+                self._make_request('POST', endpoint, body)
             except Exception as api_error:
-                # If that fails, try with a standard reason
-                if "reason" in str(api_error).lower():
-                    # Try with common valid reasons
-                    valid_reasons = ["initiator", "autostart", "autostop", "shutdown"]
-                    
-                    for valid_reason in valid_reasons:
-                        try:
-                            build_data_with_reason = {
-                                "transition": "stop",
-                                "reason": valid_reason
-                            }
-                            response = self._make_request('POST', endpoint, build_data_with_reason)
-                            print(f"Successfully initiated stop for workspace {workspace_id}: {reason} (API reason: {valid_reason})")
-                            return True
-                        except Exception:
-                            continue
-                
-                # If all attempts fail, re-raise the original error
-                raise api_error
+                if not is_stop_reason_error(api_error):
+                    raise
+                # The server stopped accepting the learned body: probe again for this
+                # workspace, which also replaces the stale on-disk entry
+                with self._stop_body_lock:
+                    if self._stop_body is not None and self._stop_body != body:
+                        # Another stop already re-learned it while we waited
+                        body = self._stop_body
+                        self._make_request('POST', endpoint, body)
+                    else:
+                        body = self._discover_stop_body(endpoint)
+            
+            self.report_stopped(workspace_id, reason, body)
+            return True
             
         except Exception as e:
             print(f"Failed to stop workspace {workspace_id}: {e}")
             return False
     
+    def report_stopped(self, workspace_id: str, reason: str, body: Dict) -> None:
+        """
+        Record a successfully initiated stop: drop cached workspace listings and
+        report it, noting the API reason if one was sent
+        
+        Args:
+            workspace_id: Workspace ID that was stopped
+            reason: Reason for stopping (for logging only)
+            body: Request body that succeeded
+        """
+        self.invalidate_cache('/api/v2/workspaces')
+        if 'reason' in body:
+            print(f"Successfully initiated stop for workspace {workspace_id}: {reason} (API reason: {body['reason']})")
+        else:
+            print(f"Successfully initiated stop for workspace {workspace_id}: {reason}")
+    
     def bulk_stop_workspaces(self, workspace_ids: List[str], reason: str = "Bulk stop", 
-                           max_concurrent: int = 5) -> Dict[str, bool]:
+                           max_concurrent: int = 5, max_per_second: float = 2.0) -> Dict[str, bool]:
         """
-        Stop multiple workspaces with rate limiting
+        Stop multiple workspaces concurrently with rate limiting
         
         Args:
             workspace_ids: List of workspace IDs to stop
             reason: Reason for stopping
             max_concurrent: Maximum concurrent stop operations
+            max_per_second: Maximum stop operations started per second across all workers
             
         Returns:
             Dictionary mapping workspace_id to success status
         """
-        results = {}
+        if not workspace_ids:
+            return {}
         
-        # Process workspaces in batches to avoid overwhelming the API
-        for i in range(0, len(workspace_ids), max_concurrent):
-            batch = workspace_ids[i:i + max_concurrent]
-            
-            for workspace_id in batch:
-                results[workspace_id] = self.stop_workspace(workspace_id, reason)
-                time.sleep(0.5)  # Small delay between requests
-            
-            # Longer delay between batches
-            if i + max_concurrent < len(workspace_ids):
-                time.sleep(2)
+        limiter = RateLimiter(max_per_second, burst=max(1, max_concurrent))
+        
+        def stop_one(workspace_id: str) -> bool:
+            limiter.acquire()
+            return self.stop_workspace(workspace_id, reason)
         
-        return results
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrent)) as executor:
+            futures = {executor.submit(stop_one, wid): wid for wid in workspace_ids}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    print(f"Failed to stop workspace {futures[future]}: {e}")
+                    results[futures[future]] = False
+        
+        # Preserve the caller's ordering
+        return {wid: results[wid] for wid in workspace_ids}
     
     def get_workspace_status(self, workspace_id: str) -> Optional[Dict]:
         """
@@ -282,7 +895,7 @@ class WorkspaceController:
             List of template dictionaries
         """
         try:
-            response = self._make_request('GET', '/api/v2/templates')
+            response = self._cached_get('/api/v2/templates')
             return response if isinstance(response, list) else []
             
         except Exception as e:
@@ -299,6 +912,43 @@ class WorkspaceController:
         templates = self.get_templates()
         return {tpl['id']: tpl['name'] for tpl in templates}
     
+    def get_template_name(self, template_id: str) -> str:
+        """
+        Get a template's name, fetching templates one at a time until enough
+        distinct ones are needed that loading the full list is cheaper
+        
+        Args:
+            template_id: Template ID
+            
+        Returns:
+            Template name, or the ID itself if it cannot be resolved
+        """
+        with _template_names_lock:
+            entry = _template_names.get(self._cache_fp)
+            if entry is not None and entry[0] > time.monotonic() and template_id in entry[1]:
+                return entry[1][template_id]
+        
+        if self._template_lookups >= TEMPLATE_LOOKUPS_BEFORE_BULK:
+            names = self.get_template_map()
+            name = names.get(template_id, template_id)
+        else:
+            self._template_lookups += 1
+            try:
+                name = self._make_request('GET', f"/api/v2/templates/{template_id}").get('name', template_id)
+            except Exception:
+                name = template_id
+            names = {}
+        names[template_id] = name
+        
+        # Shared entries expire with the template list (names can change)
+        with _template_names_lock:
+            entry = _template_names.get(self._cache_fp)
+            if entry is None or entry[0] <= time.monotonic():
+                entry = (time.monotonic() + CACHE_TTLS['/api/v2/templates'], {})
+                _template_names[self._cache_fp] = entry
+            entry[1].update(names)
+        return name
+    
     def workspace_summary(self, workspace: Dict) -> str:
         """
         Generate a human-readable summary of a workspace
@@ -309,20 +959,25 @@ class WorkspaceController:
         Returns:
             Formatted workspace summary string
         """
+        status = workspace.get('latest_build', {}).get('status', 'Unknown')
+        
+        # Reuse the summary if this workspace was already summarized in this state
+        cache_key = (workspace.get('id'), status)
+        summary = self._summary_cache.get(cache_key)
+        if summary is not None:
+            return summary
+        
         owner = workspace.get('owner_name', 'Unknown')
         name = workspace.get('name', 'Unknown')
-        status = workspace.get('latest_build', {}).get('status', 'Unknown')
         template_id = workspace.get('template_id', 'Unknown')
         
         # Get template name if possible
-        template_map = getattr(self, '_template_map', None)
-        if not template_map:
-            self._template_map = self.get_template_map()
-            template_map = self._template_map
-        
-        template_name = template_map.get(template_id, template_id)
+        template_name = self.get_template_name(template_id)
         
-        return f"{owner}/{name} ({template_name}) - {status}"
+        summary = f"{owner}/{name} ({template_name}) - {status}"
+        if cache_key[0] is not None:
+            self._summary_cache[cache_key] = summary
+        return summary
     
     def get_enterprise_quiet_hours(self) -> Optional[Dict]:
         """
@@ -331,12 +986,11 @@ class WorkspaceController:
         Returns:
             Enterprise quiet hours configuration or None if not available
         """
-        try:
-            response = self._make_request('GET', '/api/v2/deployment/config')
-            return response.get('config', {}).get('user_quiet_hours_schedule', None)
-        except Exception as e:
-            print(f"Error fetching enterprise quiet hours: {e}")
+        # Reads the same (cached) response that get_deployment_config() returns
+        deployment_config = self.get_deployment_config()
+        if not deployment_config:
             return None
+        return deployment_config.get('config', {}).get('user_quiet_hours_schedule', None)
     
     def get_user_quiet_hours_schedule(self, username: str = None) -> Optional[Dict]:
         """
@@ -368,7 +1022,7 @@ class WorkspaceController:
             Current user information or None if not available
         """
         try:
-            response = self._make_request('GET', '/api/v2/users/me')
+            response = self._cached_get('/api/v2/users/me')
             return response
         except Exception as e:
             print(f"Error fetching current user: {e}")
@@ -381,113 +1035,136 @@ class WorkspaceController:
         Returns:
             Deployment configuration or None if not available
         """
+        endpoint = '/api/v2/deployment/config'
+        ttl = CACHE_TTLS[endpoint]
+        
+        # Seed the in-memory cache from the on-disk copy (from an earlier run),
+        # keeping its age so it expires on the same TTL as a fetched response
+        if endpoint not in self._cache:
+            saved = self._cache_load('deployment_config', max_age=ttl)
+            if saved is not None:
+                try:
+                    age = max(0.0, time.time() - os.path.getmtime(self._cache_path('deployment_config')))
+                except OSError:
+                    age = ttl
+                fetched_at = time.monotonic() - age
+                self._cache[endpoint] = (fetched_at + ttl, saved, fetched_at)
+        
         try:
-            response = self._make_request('GET', '/api/v2/deployment/config')
+            cached = self._cache.get(endpoint)
+            response = self._cached_get(endpoint)
+            # Only a newly fetched response refreshes the on-disk copy
+            if cached is None or response is not cached[1]:
+                self._cache_store('deployment_config', response)
             return response
         except Exception as e:
             print(f"Error fetching deployment config: {e}")
             return None
     
-    def print_enterprise_quiet_hours(self) -> None:
+    def print_enterprise_quiet_hours(self, current_user: Dict = None,
+                                     deployment_config: Dict = None,
+                                     user_schedule: Dict = None) -> None:
         """
         Print comprehensive enterprise and user quiet hours information
+        
+        Args:
+            current_user: Pre-fetched current user (fetched if omitted)
+            deployment_config: Pre-fetched deployment config (fetched if omitted)
+            user_schedule: Pre-fetched current user's quiet hours schedule (fetched if omitted)
         """
-        print("=" * 80)
-        print("ENTERPRISE QUIET HOURS CONFIGURATION")
-        print("=" * 80)
+        # Fetch first so any fetch errors are printed before the report
+        if current_user is None:
+            current_user = self.get_current_user()
+        if deployment_config is None:
+            deployment_config = self.get_deployment_config()
+        if user_schedule is None:
+            user_schedule = self.get_user_quiet_hours_schedule()
+        
+        # Build the whole report and write it once
+        lines = ["=" * 80, "ENTERPRISE QUIET HOURS CONFIGURATION", "=" * 80]
         
-        # Get current user info
-        current_user = self.get_current_user()
+        # Current user info
         if current_user:
-            print(f"Current User: {current_user.get('username', 'Unknown')} ({current_user.get('email', 'No email')})")
-            print(f"User ID: {current_user.get('id', 'Unknown')}")
+            lines.append(f"Current User: {current_user.get('username', 'Unknown')} ({current_user.get('email', 'No email')})")
+            lines.append(f"User ID: {current_user.get('id', 'Unknown')}")
             roles = current_user.get('roles', [])
             if roles and isinstance(roles[0], dict):
                 role_names = [role.get('name', 'Unknown') for role in roles]
-                print(f"User Role: {', '.join(role_names)}")
+                lines.append(f"User Role: {', '.join(role_names)}")
             else:
-                print(f"User Role: {', '.join(roles) if roles else 'No roles'}")
+                lines.append(f"User Role: {', '.join(roles) if roles else 'No roles'}")
         else:
-            print("Current User: Unable to fetch user information")
+            lines.append("Current User: Unable to fetch user information")
         
-        print()
+        lines.append("")
         
-        # Get deployment configuration
-        deployment_config = self.get_deployment_config()
+        # Deployment configuration
         if deployment_config:
             config = deployment_config.get('config', {})
             
             # Check for enterprise quiet hours settings
             quiet_hours_config = config.get('user_quiet_hours_schedule', {})
             
-            print("📋 ENTERPRISE QUIET HOURS POLICY:")
-            print("-" * 50)
+            lines.append("📋 ENTERPRISE QUIET HOURS POLICY:")
+            lines.append("-" * 50)
             
             if quiet_hours_config:
-                print(f"Enabled: {quiet_hours_config.get('enabled', 'Not set')}")
-                print(f"Default Schedule: {quiet_hours_config.get('default_schedule', 'Not set')}")
-                print(f"Allow User Override: {quiet_hours_config.get('allow_user_custom', 'Not set')}")
+                lines.append(f"Enabled: {quiet_hours_config.get('enabled', 'Not set')}")
+                lines.append(f"Default Schedule: {quiet_hours_config.get('default_schedule', 'Not set')}")
+                lines.append(f"Allow User Override: {quiet_hours_config.get('allow_user_custom', 'Not set')}")
                 
                 # Print default schedule details if available
                 default_schedule = quiet_hours_config.get('default_schedule')
                 if default_schedule and isinstance(default_schedule, dict):
-                    print("\nDefault Schedule Details:")
-                    print(f"  Start Time: {default_schedule.get('start_time', 'Not set')}")
-                    print(f"  End Time: {default_schedule.get('end_time', 'Not set')}")
-                    print(f"  Timezone: {default_schedule.get('timezone', 'Not set')}")
-                    print(f"  Days: {default_schedule.get('days', 'Not set')}")
+                    lines.append("\nDefault Schedule Details:")
+                    lines.append(f"  Start Time: {default_schedule.get('start_time', 'Not set')}")
+                    lines.append(f"  End Time: {default_schedule.get('end_time', 'Not set')}")
+                    lines.append(f"  Timezone: {default_schedule.get('timezone', 'Not set')}")
+                    lines.append(f"  Days: {default_schedule.get('days', 'Not set')}")
             else:
-                print("No enterprise quiet hours policy configured")
+                lines.append("No enterprise quiet hours policy configured")
             
             # Check for other relevant enterprise settings
-            print("\n🏢 OTHER ENTERPRISE SETTINGS:")
-            print("-" * 50)
-            
-            # Workspace settings
-            workspace_settings = {
-                'max_ttl': config.get('max_ttl_ms'),
-                'default_ttl': config.get('default_ttl_ms'),
-                'activity_bump': config.get('activity_bump_ms'),
-                'failure_ttl': config.get('failure_ttl_ms')
-            }
-            
-            for setting, value in workspace_settings.items():
+            lines.append("\n🏢 OTHER ENTERPRISE SETTINGS:")
+            lines.append("-" * 50)
+            
+            # Workspace settings, read from the same config response
+            for label, key in WORKSPACE_TTL_SETTINGS:
+                value = config.get(key)
                 if value is not None:
-                    if setting.endswith('_ttl') or setting == 'activity_bump':
-                        # Convert milliseconds to human readable
-                        hours = value / (1000 * 60 * 60)
-                        print(f"  {setting.replace('_', ' ').title()}: {hours:.1f} hours ({value} ms)")
-                    else:
-                        print(f"  {setting.replace('_', ' ').title()}: {value}")
+                    # Convert milliseconds to human readable
+                    hours = value / (1000 * 60 * 60)
+                    lines.append(f"  {label}: {hours:.1f} hours ({value} ms)")
         else:
-            print("❌ Unable to fetch enterprise deployment configuration")
-        
-        print()
+            lines.append("❌ Unable to fetch enterprise deployment configuration")
         
-        # Get user-specific quiet hours schedule
-        user_schedule = self.get_user_quiet_hours_schedule()
+        lines.append("")
         
-        print("👤 USER QUIET HOURS SCHEDULE:")
-        print("-" * 50)
+        # User-specific quiet hours schedule
+        lines.append("👤 USER QUIET HOURS SCHEDULE:")
+        lines.append("-" * 50)
         
         if user_schedule:
-            print("UserQuietHoursScheduleResponse:")
-            print(json.dumps(user_schedule, indent=2))
+            lines.append("UserQuietHoursScheduleResponse:")
+            schedule_json = io.StringIO()
+            dump_json(user_schedule, schedule_json)
+            lines.append(schedule_json.getvalue().rstrip("\n"))
             
             # Parse and display in a more readable format
             schedule = user_schedule.get('schedule', {})
             if schedule:
-                print("\nParsed Schedule:")
-                print(f"  Start Time: {schedule.get('start_time', 'Not set')}")
-                print(f"  End Time: {schedule.get('end_time', 'Not set')}")
-                print(f"  Timezone: {schedule.get('timezone', 'Not set')}")
-                print(f"  Days: {schedule.get('days', 'Not set')}")
-                print(f"  Next Activation: {user_schedule.get('next', 'Not set')}")
-                print(f"  Time Until Next: {user_schedule.get('time_until_next', 'Not set')}")
+                lines.append("\nParsed Schedule:")
+                lines.append(f"  Start Time: {schedule.get('start_time', 'Not set')}")
+                lines.append(f"  End Time: {schedule.get('end_time', 'Not set')}")
+                lines.append(f"  Timezone: {schedule.get('timezone', 'Not set')}")
+                lines.append(f"  Days: {schedule.get('days', 'Not set')}")
+                lines.append(f"  Next Activation: {user_schedule.get('next', 'Not set')}")
+                lines.append(f"  Time Until Next: {user_schedule.get('time_until_next', 'Not set')}")
         else:
-            print("No user-specific quiet hours schedule configured")
+            lines.append("No user-specific quiet hours schedule configured")
         
-        print("\n" + "=" * 80)
+        lines.append("\n" + "=" * 80)
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def get_organizations(self) -> List[Dict]:
         """
@@ -497,7 +1174,7 @@ class WorkspaceController:
             List of organization dictionaries
         """
         try:
-            response = self._make_request('GET', '/api/v2/organizations')
+            response = self._cached_get('/api/v2/organizations')
             return response if isinstance(response, list) else []
         except Exception as e:
             print(f"Error fetching organizations: {e}")
@@ -554,6 +1231,61 @@ class WorkspaceController:
             print(f"Error fetching users: {e}")
             return []
     
+    def get_users_by_username(self, ttl: float = 300) -> Dict[str, Dict]:
+        """
+        Get all users indexed by username, reusing the index for ttl seconds
+        
+        Args:
+            ttl: Seconds the index stays valid
+            
+        Returns:
+            Dictionary mapping username to user dictionary
+        """
+        cached = self._users_by_username
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
+        users_by_username = {u.get('username'): u for u in self.get_users()}
+        self._users_by_username = (time.monotonic() + ttl, users_by_username)
+        return users_by_username
+    
+    def get_user_group_index(self, ttl: float = 300) -> Dict[str, List[Dict]]:
+        """
+        Get groups indexed by member user ID, reusing the index for ttl seconds
+        
+        Args:
+            ttl: Seconds the index stays valid
+            
+        Returns:
+            Dictionary mapping user_id to the groups that user belongs to
+        """
+        cached = self._user_group_index
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
+        groups = self.get_groups()
+        
+        # Group listings usually embed members; fetch the missing lists concurrently
+        missing = [group for group in groups if group.get('members') is None]
+        fetched = {}
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(10, len(missing))) as executor:
+                member_lists = executor.map(self.get_group_members,
+                                            [group.get('id', '') for group in missing])
+                fetched = {id(group): members for group, members in zip(missing, member_lists)}
+        
+        index = defaultdict(list)
+        for group in groups:
+            members = group.get('members')
+            if members is None:
+                members = fetched.get(id(group), [])
+            for member in members:
+                index[member.get('id')].append(group)
+        
+        index = dict(index)
+        self._user_group_index = (time.monotonic() + ttl, index)
+        return index
+    
     def get_group_members(self, group_id: str) -> List[Dict]:
         """
         Get members of a specific group
@@ -591,14 +1323,8 @@ class WorkspaceController:
             org_ids = response.get('organization_ids', [])
             
             # Get full organization details
-            organizations = []
-            all_orgs = self.get_organizations()
-            
-            for org in all_orgs:
-                if org.get('id') in org_ids:
-                    organizations.append(org)
-            
-            return organizations
+            orgs_by_id = {org.get('id'): org for org in self.get_organizations()}
+            return [orgs_by_id[org_id] for org_id in org_ids if org_id in orgs_by_id]
         except Exception as e:
             print(f"Error fetching user organizations for {user_id}: {e}")
             return []
@@ -614,54 +1340,64 @@ class WorkspaceController:
             List of group dictionaries
         """
         try:
-            # This might need to be implemented differently depending on Coder API
-            # For now, we'll check all groups and see which ones the user is in
-            all_groups = self.get_groups()
-            user_groups = []
-            
-            for group in all_groups:
-                group_members = self.get_group_members(group.get('id', ''))
-                for member in group_members:
-                    if member.get('id') == user_id:
-                        user_groups.append(group)
-                        break
-            
-            return user_groups
+            return self.get_user_group_index().get(user_id, [])
         except Exception as e:
             print(f"Error fetching user groups for {user_id}: {e}")
             return []
     
-    def validate_connection(self) -> bool:
+    def validate_connection(self, max_age: float = 60) -> bool:
         """
         Validate connection to Coder API
         
+        Args:
+            max_age: Seconds a successful validation is trusted before re-probing
+            
         Returns:
             True if connection is successful, False otherwise
         """
+        if self._validated_at is not None and time.monotonic() - self._validated_at < max_age:
+            return True
+        
         try:
             self._make_request('GET', '/api/v2/workspaces')
+            self._validated_at = time.monotonic()
             return True
         except Exception as e:
             print(f"Connection validation failed: {e}")
             return False
 
+_default_controller = None
+_default_controller_lock = threading.Lock()
+
+def get_default_controller() -> WorkspaceController:
+    """
+    Get a process-wide WorkspaceController built from the environment
+    
+    Returns:
+        Shared WorkspaceController instance (created on first call)
+    """
+    global _default_controller
+    with _default_controller_lock:
+        if _default_controller is None:
+            _default_controller = WorkspaceController()
+        return _default_controller
+
 def main():
     """Example usage of WorkspaceController"""
     try:
-        controller = WorkspaceController()
-        
-        if not controller.validate_connection():
-            print("Failed to connect to Coder API")
-            sys.exit(1)
-        
-        print("Connected to Coder API successfully")
-        
-        # Get running workspaces
-        running = controller.get_running_workspaces()
-        print(f"Found {len(running)} running workspaces:")
-        
-        for ws in running:
-            print(f"  - {controller.workspace_summary(ws)}")
+        with WorkspaceController() as controller:
+            if not controller.validate_connection():
+                print("Failed to connect to Coder API")
+                sys.exit(1)
+            
+            print("Connected to Coder API successfully")
+            
+            # Get running workspaces
+            running = controller.get_running_workspaces()
+            print(f"Found {len(running)} running workspaces:")
+            
+            for ws in running:
+                print(f"  - {controller.workspace_summary(ws)}")
         
     except Exception as e:
         print(f"Error: {e}")